@@ -1,33 +1,132 @@
 import os
 import json
+import hashlib
+import ipaddress
+import click
+import io
 import re
-import requests
+import sqlite3
 import time
-import traceback
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory
-from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from werkzeug.utils import secure_filename
+import threading
+from collections import OrderedDict, namedtuple
+import mimetypes
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory, abort, stream_with_context, stream_template, get_flashed_messages
+from jinja2 import FileSystemBytecodeCache
+from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
+from werkzeug.security import safe_join
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
-from models import db, User, Category, Recipe, Comment, Page, Image
-from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import joinedload
+from models import db, User, Category, Recipe, Comment, Page, Image, LoginThrottle, RecipeView, upgrade_schema
+import bulk
+from db_routing import mark_primary_sticky
+from suggest import SuggestionService, KIND_CATEGORY, KIND_RECIPE
+from fragment_cache import FragmentCache, FragmentCacheExtension
+from trending import ViewCounter, trending_recipes, popular_this_week
+from jobs import PeriodicJobs
+from logging_setup import configure_logging
+from gallery import UploadProcessor, UploadRejected
+from profiler import SamplingProfiler, ProfilerBusy
+from image_probe import find_page_image, is_html, charset_of
+from changefeed import ChangeConsumer, init_change_feed, prune as prune_changes, head as change_feed_head
+from compression import CompressionMiddleware
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urljoin
+from email.utils import format_datetime
+from xml.sax.saxutils import escape as xml_escape
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+# JSON loglar kuyruk üzerinden yazılır (LOG_LEVEL, LOG_FORMAT, LOG_DEBUG_SAMPLE_RATE)
+configure_logging(app)
+
+def normalize_database_url(url):
+    # Render uses postgres:// but SQLAlchemy needs postgresql://
+    if url.startswith('postgres://'):
+        url = url.replace('postgres://', 'postgresql://', 1)
+    return url
 
 # Database configuration - support both SQLite (dev) and PostgreSQL (production)
-database_url = os.getenv('DATABASE_URL', 'sqlite:///nefisyemekler.db')
-# Render uses postgres:// but SQLAlchemy needs postgresql://
-if database_url.startswith('postgres://'):
-    database_url = database_url.replace('postgres://', 'postgresql://', 1)
+database_url = normalize_database_url(os.getenv('DATABASE_URL', 'sqlite:///nefisyemekler.db'))
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+# Okuma kopyaları (virgülle ayrılmış); GET isteklerindeki SELECT'ler bunlara gider
+replica_urls = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+app.config['SQLALCHEMY_BINDS'] = {f'replica{i}': normalize_database_url(url) for i, url in enumerate(replica_urls)}
+app.config['DATABASE_REPLICA_KEYS'] = list(app.config['SQLALCHEMY_BINDS'])
+# Yazan kullanıcı bu kadar saniye birincil veritabanından okur (kendi yazdığını görsün)
+app.config['DATABASE_STICKY_SECONDS'] = float(os.getenv('DATABASE_STICKY_SECONDS', 5))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+# Yükleme sunumu: 'python' (sendfile ile), 'accel' (nginx X-Accel-Redirect) veya 'sendfile' (X-Sendfile)
+app.config['UPLOAD_SERVE_MODE'] = os.getenv('UPLOAD_SERVE_MODE', 'python')
+app.config['UPLOAD_ACCEL_PREFIX'] = os.getenv('UPLOAD_ACCEL_PREFIX', '/protected-uploads/')
+app.config['USE_X_SENDFILE'] = app.config['UPLOAD_SERVE_MODE'] == 'sendfile'
+# Yüklemesi süren dosyalar silinmesin diye bu süreden yeni dosyalara dokunulmaz
+app.config['UPLOAD_GC_GRACE_SECONDS'] = int(os.getenv('UPLOAD_GC_GRACE_SECONDS', 3600))
+# Oturum kimliği önbelleği (saniye / kayıt sayısı); 0 TTL önbelleği kapatır
+app.config['USER_CACHE_TTL'] = float(os.getenv('USER_CACHE_TTL', 30))
+app.config['USER_CACHE_SIZE'] = int(os.getenv('USER_CACHE_SIZE', 1024))
+# Diğer işçilerde değişen/silinen kullanıcılar için değişiklik akışına bakma aralığı (saniye)
+app.config['USER_CACHE_CHECK_INTERVAL'] = float(os.getenv('USER_CACHE_CHECK_INTERVAL', 1))
+# Giriş/kayıt denemesi sınırlama: 'memory' (işçi başına) veya 'database' (işçiler arası ortak)
+app.config['LOGIN_THROTTLE_BACKEND'] = os.getenv('LOGIN_THROTTLE_BACKEND', 'memory')
+app.config['LOGIN_THROTTLE_MAX_KEYS'] = int(os.getenv('LOGIN_THROTTLE_MAX_KEYS', 10000))
+# Görsel URL'si bir sayfaysa kapak görseli aranırken okunacak en fazla bayt / süre
+app.config['IMAGE_PROBE_MAX_BYTES'] = int(os.getenv('IMAGE_PROBE_MAX_BYTES', 512 * 1024))
+app.config['IMAGE_PROBE_SECONDS'] = float(os.getenv('IMAGE_PROBE_SECONDS', 6))
+# Değişiklik akışında bu kadar saatten eski olaylar silinir (her kaydın sonuncusu kalır)
+app.config['CHANGE_FEED_RETENTION_HOURS'] = float(os.getenv('CHANGE_FEED_RETENTION_HOURS', 72))
+# Budama arka planda bu kadar saatte bir, tüm işçiler arasında bir kez çalışır (bkz. jobs.py)
+app.config['CHANGE_FEED_PRUNE_HOURS'] = float(os.getenv('CHANGE_FEED_PRUNE_HOURS', 6))
+# Periyodik bakım işlerinin arka plan iş parçacığı (0: yalnızca flask komutlarıyla)
+app.config['BACKGROUND_JOBS'] = os.getenv('BACKGROUND_JOBS', '1') == '1'
+# Render gibi bir proxy arkasında gerçek istemci IP'si için X-Forwarded-For atlama sayısı.
+# Render (RENDER ortam değişkeni) önünde tek bir yük dengeleyici olduğundan orada 1
+app.config['PROXY_FIX_X_FOR'] = int(os.getenv('PROXY_FIX_X_FOR', 1 if os.getenv('RENDER') else 0))
+
+# Yanıt sıkıştırma: gzip (Brotli paketi kuruluysa br); COMPRESS_ENABLED=0 ile
+# kapatılır (ör. sıkıştırmayı önündeki proxy yapıyorsa)
+app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', '1') == '1'
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', 6))
+app.config['COMPRESS_BROTLI_QUALITY'] = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+app.config['COMPRESS_CACHE_MB'] = float(os.getenv('COMPRESS_CACHE_MB', 16))
+
+if app.config['COMPRESS_ENABLED']:
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        min_size=app.config['COMPRESS_MIN_SIZE'],
+        level=app.config['COMPRESS_LEVEL'],
+        brotli_quality=app.config['COMPRESS_BROTLI_QUALITY'],
+        cache_bytes=int(app.config['COMPRESS_CACHE_MB'] * 1024 * 1024),
+    )
+    app.extensions['compression'] = app.wsgi_app
+
+if app.config['PROXY_FIX_X_FOR']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
+# Tarif kartları için Jinja {% cache %} parça önbelleği
+app.jinja_env.add_extension(FragmentCacheExtension)
+app.jinja_env.fragment_cache.maxsize = int(os.getenv('FRAGMENT_CACHE_SIZE', 5000))
+app.jinja_env.fragment_cache.ttl = float(os.getenv('FRAGMENT_CACHE_TTL', 300))
+
+# Açılış süresi: build.sh veritabanını hazırlar ve şablonları önceden derler
+app.config['DB_INIT_ON_STARTUP'] = os.getenv('DB_INIT_ON_STARTUP', '1') == '1'
+# Isınma import'ta değil, gunicorn'un when_ready/post_worker_init kancalarında yapılır
+app.config['WARM_UP_ON_START'] = os.getenv('WARM_UP_ON_START', '1') == '1'
+app.config['JINJA_BYTECODE_CACHE_DIR'] = os.getenv(
+    'JINJA_BYTECODE_CACHE_DIR', os.path.join(app.root_path, '.jinja_cache'))
+if app.config['JINJA_BYTECODE_CACHE_DIR']:
+    os.makedirs(app.config['JINJA_BYTECODE_CACHE_DIR'], exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['JINJA_BYTECODE_CACHE_DIR'])
 
 # Create upload folder if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -39,6 +138,8 @@ def resolve_image_url(candidate_url):
     """
     if not candidate_url:
         return None
+    import requests  # yalnızca dış bağlantı gerektiğinde yüklenir (açılış süresi)
+
     try:
         # Follow redirects and prefer HEAD for speed
         resp = requests.head(candidate_url, allow_redirects=True, timeout=5)
@@ -46,26 +147,20 @@ def resolve_image_url(candidate_url):
         if ctype.startswith('image'):
             return resp.url
 
-        # If HEAD didn't return an image, GET the page and try to extract an image
-        resp = requests.get(candidate_url, allow_redirects=True, timeout=6)
-        ctype = resp.headers.get('Content-Type', '')
-        if ctype.startswith('image'):
-            return resp.url
-
-        html = resp.text or ''
-        # Try common meta tags
-        m = re.search(r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']', html, re.I)
-        if not m:
-            m = re.search(r'<meta[^>]+name=["\']twitter:image["\'][^>]+content=["\']([^"\']+)["\']', html, re.I)
-        if m:
-            img_url = m.group(1)
-            return urljoin(resp.url, img_url)
-
-        # Fallback: first <img> tag
-        m = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', html, re.I)
-        if m:
-            img_url = m.group(1)
-            return urljoin(resp.url, img_url)
+        # If HEAD didn't return an image, stream the page and scan its tags;
+        # stop at og:image, the byte cap or the deadline, whichever comes first
+        deadline = time.monotonic() + app.config['IMAGE_PROBE_SECONDS']
+        with requests.get(candidate_url, allow_redirects=True, timeout=6, stream=True) as resp:
+            ctype = resp.headers.get('Content-Type', '')
+            if ctype.startswith('image'):
+                return resp.url
+            if ctype and not is_html(ctype):
+                return None
+            img_url, _ = find_page_image(resp.iter_content(16 * 1024),
+                                         max_bytes=app.config['IMAGE_PROBE_MAX_BYTES'],
+                                         encoding=charset_of(ctype), deadline=deadline)
+            if img_url:
+                return urljoin(resp.url, img_url)
 
     except Exception:
         # Don't crash on network errors; caller can fallback to original URL
@@ -74,16 +169,31 @@ def resolve_image_url(candidate_url):
 
 # Initialize extensions
 db.init_app(app)
+# İzlenen tablolara her yazma aynı transaction'da change_events'e de yazılır
+init_change_feed(db.session)
+
+
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores ON DELETE CASCADE unless foreign keys are switched on."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+app.after_request(mark_primary_sticky)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 login_manager.login_message = 'Lütfen giriş yapın.'
 
-# Create tables on startup (for production)
-with app.app_context():
+def init_database():
+    """Create tables, add new columns and seed the initial data (idempotent)."""
     try:
         db.create_all()
-        print('✓ Database tables created/verified')
+        app.logger.info('Database tables created/verified')
+        for column in upgrade_schema():
+            app.logger.info('Added column %s', column)
         
         # Seed database with initial data
         admin = User.query.filter_by(username='admin').first()
@@ -91,7 +201,7 @@ with app.app_context():
             admin = User(username='admin', is_admin=True)
             admin.set_password('admin123')
             db.session.add(admin)
-            print('✓ Admin user created (username: admin, password: admin123)')
+            app.logger.info('Admin user created (username: admin, password: admin123)')
         
         # Add categories if not exist
         categories_data = [
@@ -108,7 +218,7 @@ with app.app_context():
             if not existing:
                 cat = Category(**cat_data)
                 db.session.add(cat)
-                print(f'✓ Category added: {cat_data["name"]}')
+                app.logger.info('Category added: %s', cat_data['name'])
         
         db.session.commit()
         
@@ -307,10 +417,10 @@ with app.app_context():
         if admin:
             # Check if we need to add sample recipes (if database is empty or missing recipes)
             existing_recipe_count = Recipe.query.count()
-            print(f'Current recipe count: {existing_recipe_count}')
+            app.logger.info('Current recipe count: %d', existing_recipe_count)
             
             if existing_recipe_count < len(sample_recipes):
-                print('Adding sample recipes...')
+                app.logger.info('Adding sample recipes...')
                 for recipe_data in sample_recipes:
                     # Get category by slug
                     category = Category.query.filter_by(slug=recipe_data['category_slug']).first()
@@ -334,60 +444,649 @@ with app.app_context():
                                 servings=recipe_data.get('servings')
                             )
                             db.session.add(recipe)
-                            print(f'✓ Recipe added: {recipe_data["title"]}')
+                            app.logger.info('Recipe added: %s', recipe_data['title'])
                 
                 db.session.commit()
-                print(f'✓ Sample recipes added! Total: {Recipe.query.count()}')
+                app.logger.info('Sample recipes added! Total: %d', Recipe.query.count())
             else:
-                print('✓ Sample recipes already exist')
+                app.logger.info('Sample recipes already exist')
         
-        print('✓ Database initialization complete!')
+        app.logger.info('Database initialization complete')
         
-    except Exception as e:
-        print(f'✗ Database error: {e}')
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        app.logger.exception('Database initialization failed')
+
+# Create tables on startup (for production). build.sh bunu zaten yaptıysa
+# DB_INIT_ON_STARTUP=0 ile atlanır; uyanan instance'ın açılışı kısalır.
+if app.config['DB_INIT_ON_STARTUP']:
+    with app.app_context():
+        init_database()
+
+class CachedUser(UserMixin):
+    """Lightweight, session-independent copy of a user's identity.
+    Only carries the fields templates and read-only views need.
+    """
+
+    def __init__(self, id, username, is_admin):
+        self.id = id
+        self.username = username
+        self.is_admin = is_admin
+
+    def __repr__(self):
+        return f'<CachedUser {self.username}>'
+
+
+class UserIdentityCache:
+    """Bounded, per-process LRU cache of (id, username, is_admin) with a TTL.
+
+    Admins are never cached: their row is re-read on every request, so a
+    revoked admin flag takes effect in every worker at once. For everyone
+    else, at most every ``check_interval`` seconds the user events written by
+    any process since the last check are read from the change feed and those
+    users are evicted, so a deleted or changed account is not served from
+    another worker's cache for the rest of its TTL.
+    """
+
+    def __init__(self, ttl, maxsize, check_interval=1.0):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.check_interval = check_interval
+        # Boşlukta beklemek de kaçırmak da en fazla TTL kadar bayat kayıt demek
+        self.feed = ChangeConsumer(entities=(User.__tablename__,), gap_grace=min(ttl, 5.0))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._checked_at = None
+
+    def get(self, user_id):
+        self.refresh()
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None:
+                return None
+            identity, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[user_id]
+                return None
+            self._data.move_to_end(user_id)
+            return identity
+
+    def set(self, user):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        if user.is_admin:
+            self.invalidate(user.id)
+            return
+        identity = (user.id, user.username, False)
+        with self._lock:
+            self._data[user.id] = (identity, time.monotonic() + self.ttl)
+            self._data.move_to_end(user.id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def refresh(self):
+        """Evict users changed or deleted since the last check, in any process."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # başka bir iş parçacığı bakıyor
+        try:
+            if self._checked_at is None:
+                # İlk bakış: önbellek boş, yalnızca bundan sonraki olaylar önemli
+                self.clear()
+                self.feed.seek(change_feed_head())
+            else:
+                start = self.feed.position
+                changes, position = self.feed.fetch()
+                if position - start >= self.feed.batch_size:
+                    self.clear()  # çok geride: tek tek silmek yerine baştan başla
+                    position = change_feed_head()
+                for change in changes:
+                    self.invalidate(change.entity_id)
+                self.feed.seek(position)
+            self._checked_at = now
+        finally:
+            self._refresh_lock.release()
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self):
+        """Drop all entries; the next ``get`` re-syncs with the change feed head."""
+        with self._lock:
+            self._data.clear()
+            self._checked_at = None
+
+
+user_cache = UserIdentityCache(app.config['USER_CACHE_TTL'], app.config['USER_CACHE_SIZE'],
+                               app.config['USER_CACHE_CHECK_INTERVAL'])
+
+
+def _identity_cache_allowed():
+    """Only read-only, non-admin requests may use the cached identity.
+    Writes and admin views always re-read the user row; admins themselves
+    are never cached (see UserIdentityCache).
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    return not (request.endpoint or '').startswith('admin')
+
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    if _identity_cache_allowed():
+        identity = user_cache.get(user_id)
+        if identity is not None:
+            return CachedUser(*identity)
+    user = db.session.get(User, user_id)
+    if user is not None:
+        user_cache.set(user)
+    return user
+
+# ============= LOGIN THROTTLING =============
+
+class MemoryThrottleStore:
+    """Per-process throttle state, bounded to ``maxsize`` keys (LRU eviction)."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, key, fn):
+        """Atomically apply ``fn(state) -> (new_state, result)`` to one key."""
+        with self._lock:
+            state, result = fn(self._data.get(key))
+            self._data[key] = state
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DatabaseThrottleStore:
+    """Throttle state in the ``login_throttle`` table, shared by all workers.
+    Uses its own connection so it never commits the request's session.
+    """
+
+    def __init__(self, maxsize, evict_interval=60.0):
+        self.maxsize = maxsize
+        self.evict_interval = evict_interval
+        self._evicted_at = 0.0
+
+    def update(self, key, fn):
+        try:
+            result = self._update(key, fn)
+        except IntegrityError:
+            # Aynı anahtarın ilk denemesi başka bir işçide eklendi: satır artık var,
+            # kilitli okuma onu görür (fn saf bir fonksiyon, tekrar çağrılabilir)
+            result = self._update(key, fn)
+        self._evict()
+        return result
+
+    def _read(self, conn, key):
+        table = LoginThrottle.__table__
+        if conn.dialect.name == 'sqlite':
+            # SQLite FOR UPDATE'i yok sayar; boş bir UPDATE yazma kilidini okumadan önce alır
+            conn.execute(table.update().where(table.c.key == key).values(key=table.c.key))
+        return conn.execute(
+            db.select(table.c.tokens, table.c.updated, table.c.failures, table.c.blocked_until)
+            .where(table.c.key == key).with_for_update()
+        ).first()
+
+    def _update(self, key, fn):
+        table = LoginThrottle.__table__
+        with db.engine.begin() as conn:
+            row = self._read(conn, key)
+            state, result = fn(tuple(row) if row else None)
+            values = dict(zip(('tokens', 'updated', 'failures', 'blocked_until'), state))
+            if row:
+                conn.execute(table.update().where(table.c.key == key).values(**values))
+            else:
+                conn.execute(table.insert().values(key=key, **values))
+            return result
+
+    def _evict(self):
+        # Tabloyu sınırlı tut: her istekte değil, işçi başına evict_interval'da bir sayılır
+        now = time.monotonic()
+        if now - self._evicted_at < self.evict_interval:
+            return
+        self._evicted_at = now
+        table = LoginThrottle.__table__
+        with db.engine.begin() as conn:
+            excess = conn.execute(db.select(db.func.count()).select_from(table)).scalar() - self.maxsize
+            if excess > 0:
+                # En uzun süredir dokunulmamış kayıtlar; bir sonraki bakışa pay bırakılır
+                stale = db.select(table.c.key).order_by(table.c.updated).limit(excess + (self.maxsize // 10 or 1))
+                conn.execute(table.delete().where(table.c.key.in_(stale.scalar_subquery())))
+
+
+class TokenBucketThrottle:
+    """Token bucket with exponential backoff after repeated failures.
+
+    State per key is ``(tokens, updated, failures, blocked_until)``. Every
+    attempt costs one token; after ``free_failures`` failed attempts the key is
+    blocked for ``backoff_base * 2 ** n`` seconds (capped at ``backoff_max``).
+    """
+
+    def __init__(self, store, prefix, capacity, per_seconds, free_failures=3,
+                 backoff_base=2.0, backoff_max=900.0):
+        self.store = store
+        self.prefix = prefix
+        self.capacity = capacity
+        self.rate = capacity / per_seconds
+        self.free_failures = free_failures
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _refill(self, state, now):
+        if state is None:
+            return self.capacity, 0, 0.0
+        tokens, updated, failures, blocked_until = state
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        return tokens, failures, blocked_until
+
+    def hit(self, key):
+        """Consume one token. Returns 0 if allowed, otherwise seconds to wait."""
+        def fn(state):
+            now = time.time()
+            tokens, failures, blocked_until = self._refill(state, now)
+            if blocked_until > now:
+                return (tokens, now, failures, blocked_until), blocked_until - now
+            if tokens < 1:
+                return (tokens, now, failures, blocked_until), (1 - tokens) / self.rate
+            return (tokens - 1, now, failures, blocked_until), 0
+        return self.store.update(self.prefix + key, fn)
+
+    def failure(self, key):
+        def fn(state):
+            now = time.time()
+            tokens, failures, blocked_until = self._refill(state, now)
+            failures += 1
+            if failures > self.free_failures:
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (failures - self.free_failures - 1))
+                blocked_until = now + delay
+            return (tokens, now, failures, blocked_until), None
+        self.store.update(self.prefix + key, fn)
+
+    def success(self, key):
+        def fn(state):
+            now = time.time()
+            tokens, _, _ = self._refill(state, now)
+            return (tokens, now, 0, 0.0), None
+        self.store.update(self.prefix + key, fn)
+
+
+class ThrottleMetrics:
+    """Per-process counters of rejected login/register attempts."""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+if app.config['LOGIN_THROTTLE_BACKEND'] == 'database':
+    throttle_store = DatabaseThrottleStore(app.config['LOGIN_THROTTLE_MAX_KEYS'])
+else:
+    throttle_store = MemoryThrottleStore(app.config['LOGIN_THROTTLE_MAX_KEYS'])
+
+login_ip_throttle = TokenBucketThrottle(throttle_store, 'login-ip:', capacity=20, per_seconds=60, free_failures=10)
+login_user_throttle = TokenBucketThrottle(throttle_store, 'login-user:', capacity=5, per_seconds=300)
+register_ip_throttle = TokenBucketThrottle(throttle_store, 'register-ip:', capacity=5, per_seconds=3600)
+throttle_metrics = ThrottleMetrics()
+
+
+def client_ip():
+    """Client address for the per-IP throttles, or None when it is not known
+    to be the client's own. Without PROXY_FIX_X_FOR a private or loopback
+    address is most likely a proxy shared by every visitor; keying on it would
+    let one client lock everybody out, so only the per-user limits apply.
+    """
+    addr = request.remote_addr
+    if not addr:
+        return None
+    if app.config['PROXY_FIX_X_FOR']:
+        return addr
+    try:
+        return addr if ipaddress.ip_address(addr).is_global else None
+    except ValueError:
+        return None
+
+
+def throttled_response(template, retry_after, metric):
+    """429 yanıtı; şifre hash'i hesaplanmadan önce döner."""
+    throttle_metrics.incr(metric)
+    retry_after = max(1, int(retry_after + 0.999))
+    flash(f'Çok fazla deneme yaptınız. Lütfen {retry_after} saniye sonra tekrar deneyin.', 'danger')
+    return render_template(template), 429, {'Retry-After': str(retry_after)}
+
+
+# ============= AUTOCOMPLETE =============
+
+suggestions = SuggestionService(
+    check_interval=float(os.getenv('SUGGEST_CHECK_INTERVAL', 5)),
+    max_age=float(os.getenv('SUGGEST_MAX_AGE', 3600)),
+)
+
+# ============= TRENDING =============
+
+# Görüntülenmeler bellekte birikir, VIEW_FLUSH_SECONDS'ta bir toplu yazılır
+view_counter = ViewCounter(
+    app,
+    flush_interval=float(os.getenv('VIEW_FLUSH_SECONDS', 5)),
+    half_life_hours=float(os.getenv('TRENDING_HALF_LIFE_HOURS', 48)),
+)
+TRENDING_LIST_SIZE = 6
+
+# ============= PERIODIC JOBS =============
+
+# Bakım işleri her işçide bakılır, DB'deki son çalıştırma zamanıyla tek bir işçide çalışır
+periodic_jobs = PeriodicJobs(app, tick=float(os.getenv('BACKGROUND_JOBS_TICK_SECONDS', 60)))
+# Popülerlik puanları tüm tabloyu yeniden yazar: işçi başına değil, aralık başına bir kez
+periodic_jobs.add('refresh-trending', float(os.getenv('TRENDING_REFRESH_SECONDS', 300)), view_counter.refresh_trending)
+
+# ============= BULK DELETES =============
+
+def _bulk_delete(model, *criteria):
+    return db.session.execute(
+        db.delete(model).where(*criteria),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+
+
+def delete_recipes_where(*criteria):
+    """Delete matching recipes with their comments and images.
+    Runs a fixed number of DELETE statements no matter how many rows match,
+    so it also works on databases created before ON DELETE CASCADE existed.
+    """
+    recipe_ids = db.select(Recipe.id).where(*criteria)
+    _bulk_delete(Comment, Comment.recipe_id.in_(recipe_ids))
+    _bulk_delete(Image, Image.recipe_id.in_(recipe_ids))
+    _bulk_delete(RecipeView, RecipeView.recipe_id.in_(recipe_ids))
+    return _bulk_delete(Recipe, *criteria)
+
+
+def delete_comments_where(*criteria):
+    """Delete matching comments and refresh the affected recipes' aggregates."""
+    recipe_ids = list(db.session.scalars(db.select(Comment.recipe_id).where(*criteria).distinct()))
+    deleted = _bulk_delete(Comment, *criteria)
+    if recipe_ids:
+        Recipe.refresh_comment_stats(recipe_ids)
+    return deleted
+
+
+def delete_user_cascade(user_id):
+    """Delete a user, their comments and their recipes (with dependents)."""
+    delete_comments_where(Comment.user_id == user_id)
+    delete_recipes_where(Recipe.user_id == user_id)
+    deleted = _bulk_delete(User, User.id == user_id)
+    user_cache.invalidate(user_id)
+    return deleted
+
+
+# ============= UPLOAD GARBAGE COLLECTION =============
+
+# Son tarama sonucu (işçi başına); admin panelinde gösterilir
+last_upload_sweep = {}
+
+
+def _unreferenced_uploads(batch):
+    names = [name for name, _, _ in batch]
+    referenced = set(db.session.scalars(db.select(Recipe.image).where(Recipe.image.in_(names))))
+    referenced.update(db.session.scalars(db.select(Image.filename).where(Image.filename.in_(names))))
+    for name, path, size in batch:
+        if name not in referenced:
+            yield path, size
+
+
+def iter_orphaned_uploads(grace_seconds, batch_size=500):
+    """Yield (path, size) for upload files no recipe or image row references.
+    The directory is streamed with scandir and checked against the database in
+    batches, so memory stays bounded by ``batch_size``. Files modified within
+    ``grace_seconds`` are skipped so in-flight uploads are never touched.
+    """
+    cutoff = time.time() - grace_seconds
+    batch = []
+    with os.scandir(app.config['UPLOAD_FOLDER']) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.is_file(follow_symlinks=False):
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > cutoff:
+                continue
+            batch.append((entry.name, entry.path, stat.st_size))
+            if len(batch) >= batch_size:
+                yield from _unreferenced_uploads(batch)
+                batch = []
+    if batch:
+        yield from _unreferenced_uploads(batch)
+
+
+def sweep_uploads(dry_run=True, grace_seconds=None):
+    """Remove (or with dry_run just count) orphaned uploads."""
+    if grace_seconds is None:
+        grace_seconds = app.config['UPLOAD_GC_GRACE_SECONDS']
+    files = reclaimable = 0
+    for path, size in iter_orphaned_uploads(grace_seconds):
+        if not dry_run:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+        files += 1
+        reclaimable += size
+    report = {'files': files, 'bytes': reclaimable, 'dry_run': dry_run, 'finished_at': datetime.utcnow()}
+    last_upload_sweep.clear()
+    last_upload_sweep.update(report)
+    return report
+
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+# Zaman damgalı yükleme adları asla üzerine yazılmaz, bu yüzden süresiz önbelleğe alınabilir
+STABLE_UPLOAD_NAME = re.compile(r'^\d{8}_\d{6}_\d{6}_')
+
+
+# Yüklemeler sınırlı bir iş parçacığı havuzunda paralel doğrulanıp kaydedilir
+upload_processor = UploadProcessor(
+    app.config['UPLOAD_FOLDER'],
+    max_workers=int(os.getenv('UPLOAD_WORKERS', 4)),
+    max_pixels=int(os.getenv('UPLOAD_MAX_PIXELS', 50_000_000)),
+)
+
+
+def store_gallery_uploads(files):
+    """Validate uploads and write them to disk in parallel, before any
+    database write so no transaction is held open while files are processed.
+    Returns ``(stored, rejected)``: StoredImage list and user-facing messages
+    for rejected files. Raises OSError (written files removed) if storing fails.
+    """
+    files = [f for f in files if f and f.filename]
+    rejected = [f'{f.filename}: desteklenmeyen dosya türü' for f in files if not allowed_file(f.filename)]
+    stored = []
+    for result in upload_processor.store_all([f for f in files if allowed_file(f.filename)]):
+        if isinstance(result, UploadRejected):
+            rejected.append(str(result))
+        else:
+            stored.append(result)
+    return stored, rejected
+
+
+def attach_gallery_images(recipe, stored):
+    """Append stored images to the recipe's gallery. The first one becomes
+    the cover when the recipe has none.
+    """
+    position = None
+    if recipe.id is not None:
+        position = db.session.scalar(
+            db.select(db.func.max(Image.position)).where(Image.recipe_id == recipe.id)
+        )
+    position = -1 if position is None else position
+    for image in stored:
+        position += 1
+        db.session.add(Image(recipe=recipe, filename=image.filename, position=position,
+                             width=image.width, height=image.height))
+        if not recipe.image:
+            recipe.image = image.filename
+
+
+def uploaded_images():
+    """Store the request's gallery uploads; on a storage error flash it and return None."""
+    try:
+        return store_gallery_uploads(request.files.getlist('images') + request.files.getlist('image'))
+    except OSError:
+        app.logger.exception('Storing uploads failed')
+        flash('Fotoğraflar kaydedilemedi. Lütfen tekrar deneyin.', 'danger')
+        return None
+
+
+@app.route('/uploads/<path:filename>')
+def uploaded_file(filename):
+    """Serve a user upload.
+
+    In 'accel' mode the transfer is handed to nginx via X-Accel-Redirect and
+    in 'sendfile' mode via X-Sendfile, so the worker is freed immediately.
+    Otherwise send_from_directory answers range requests itself and streams
+    through the server's wsgi.file_wrapper (sendfile() under gunicorn).
+    """
+    if app.config['UPLOAD_SERVE_MODE'] == 'accel':
+        if safe_join(app.config['UPLOAD_FOLDER'], filename) is None:
+            abort(404)
+        response = app.response_class()
+        response.headers['X-Accel-Redirect'] = app.config['UPLOAD_ACCEL_PREFIX'] + filename
+        response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    else:
+        response = send_from_directory(os.path.abspath(app.config['UPLOAD_FOLDER']), filename,
+                                       conditional=True)
+    if STABLE_UPLOAD_NAME.match(filename):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 @app.route('/favicon.ico')
 def favicon():
     """Favicon route"""
     return send_from_directory(os.path.join(app.root_path, 'static'),
                              'favicon.ico', mimetype='image/vnd.microsoft.icon')
 
+# ============= RECIPE CARDS =============
+
+CardStats = namedtuple('CardStats', 'comments rating version')
+
+
+def recipe_card_stats(recipes):
+    """Comment count, average rating and a comment version for listing cards.
+    Read from the aggregates stored on each recipe, so no extra query; the
+    version goes into the fragment cache key so a new or deleted comment
+    re-renders the card.
+    """
+    return {
+        recipe.id: CardStats(recipe.comment_count, recipe.average_rating(),
+                             (recipe.comment_count, recipe.rating_sum, recipe.rating_count))
+        for recipe in recipes
+    }
+
+# ============= RECIPE COMMENTS =============
+
+COMMENTS_PAGE_SIZE = int(os.getenv('COMMENTS_PAGE_SIZE', 20))
+
+
+def encode_comment_cursor(comment):
+    return f"{comment.created_at.isoformat()}_{comment.id}"
+
+
+def comments_page(recipe_id, cursor=None, limit=COMMENTS_PAGE_SIZE):
+    """Return ``(comments, next_cursor)`` for one page, newest first.
+    Keyset pagination on (created_at, id) with the author joined in, so every
+    page costs one indexed query however deep the reader scrolls.
+    """
+    query = (
+        db.select(Comment).options(joinedload(Comment.user))
+        .where(Comment.recipe_id == recipe_id)
+        .order_by(Comment.created_at.desc(), Comment.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        try:
+            created, _, last_id = cursor.rpartition('_')
+            created, last_id = datetime.fromisoformat(created), int(last_id)
+        except ValueError:
+            abort(400)
+        query = query.where(db.or_(
+            Comment.created_at < created,
+            db.and_(Comment.created_at == created, Comment.id < last_id),
+        ))
+    comments = list(db.session.scalars(query))
+    next_cursor = encode_comment_cursor(comments[limit - 1]) if len(comments) > limit else None
+    return comments[:limit], next_cursor
+
 # ============= PUBLIC ROUTES =============
 
 @app.route('/')
 def index():
     """Ana sayfa - En yeni tarifler"""
-    recipes = Recipe.query.order_by(Recipe.created_at.desc()).limit(12).all()
+    recipes = Recipe.query.options(Recipe.card_columns()).order_by(Recipe.created_at.desc()).limit(12).all()
     categories = Category.query.all()
-    return render_template('index.html', recipes=recipes, categories=categories)
+    return render_template('index.html', recipes=recipes, categories=categories,
+                           card_stats=recipe_card_stats(recipes),
+                           trending=trending_recipes(TRENDING_LIST_SIZE),
+                           popular=popular_this_week(TRENDING_LIST_SIZE))
 
 @app.route('/category/<slug>')
 def category(slug):
     """Kategori sayfası"""
     category = Category.query.filter_by(slug=slug).first_or_404()
-    recipes = Recipe.query.filter_by(category_id=category.id).order_by(Recipe.created_at.desc()).all()
+    recipes = (
+        Recipe.query.options(Recipe.card_columns())
+        .filter_by(category_id=category.id)
+        .order_by(Recipe.created_at.desc())
+        .all()
+    )
     categories = Category.query.all()
-    return render_template('category.html', category=category, recipes=recipes, categories=categories)
+    return render_template('category.html', category=category, recipes=recipes, categories=categories,
+                           card_stats=recipe_card_stats(recipes),
+                           trending=trending_recipes(TRENDING_LIST_SIZE, category.id),
+                           popular=popular_this_week(TRENDING_LIST_SIZE, category.id))
 
 @app.route('/recipe/<int:recipe_id>')
 def recipe_detail(recipe_id):
     """Tarif detay sayfası"""
     recipe = Recipe.query.get_or_404(recipe_id)
-    comments = Comment.query.filter_by(recipe_id=recipe_id).order_by(Comment.created_at.desc()).all()
-    related_recipes = Recipe.query.filter(
+    view_counter.hit(recipe_id)
+    comments, next_cursor = comments_page(recipe_id)
+    gallery = db.session.scalars(
+        db.select(Image).where(Image.recipe_id == recipe_id).order_by(Image.position, Image.id)
+    ).all()
+    related_recipes = Recipe.query.options(Recipe.card_columns()).filter(
         Recipe.category_id == recipe.category_id,
         Recipe.id != recipe_id
     ).limit(4).all()
-    return render_template('recipe_detail.html', recipe=recipe, comments=comments, related_recipes=related_recipes)
+    return render_template('recipe_detail.html', recipe=recipe, comments=comments, next_cursor=next_cursor,
+                           gallery=gallery, related_recipes=related_recipes)
+
+@app.route('/recipe/<int:recipe_id>/comments')
+def recipe_comments(recipe_id):
+    """Yorumların sonraki sayfası (sonsuz kaydırma için JSON + HTML parçası)"""
+    comments, next_cursor = comments_page(recipe_id, request.args.get('cursor'))
+    return jsonify({
+        'html': render_template('_comments.html', comments=comments),
+        'next': url_for('recipe_comments', recipe_id=recipe_id, cursor=next_cursor) if next_cursor else None,
+    })
 
 @app.route('/recipe/<int:recipe_id>/comment', methods=['POST'])
 @login_required
@@ -408,6 +1107,7 @@ def add_comment(recipe_id):
         rating=rating
     )
     db.session.add(comment)
+    Recipe.record_comment(recipe_id, rating)
     db.session.commit()
     
     flash('Yorumunuz eklendi.', 'success')
@@ -439,7 +1139,7 @@ def search():
     if query:
         # Tarif adı, içerik ve malzemelerde arama yap
         search_pattern = f"%{query}%"
-        recipes = Recipe.query.filter(
+        recipes = Recipe.query.options(Recipe.card_columns()).filter(
             db.or_(
                 Recipe.title.ilike(search_pattern),
                 Recipe.content.ilike(search_pattern),
@@ -448,7 +1148,24 @@ def search():
         ).order_by(Recipe.created_at.desc()).all()
     
     categories = Category.query.all()
-    return render_template('search.html', recipes=recipes, query=query, categories=categories)
+    return render_template('search.html', recipes=recipes, query=query, categories=categories,
+                           card_stats=recipe_card_stats(recipes))
+
+@app.route('/search/suggest')
+def search_suggest():
+    """Arama kutusu için otomatik tamamlama önerileri (JSON)"""
+    query = request.args.get('q', '').strip()
+    results = []
+    for kind, label, ref in suggestions.search(query[:100]):
+        if kind == KIND_RECIPE:
+            results.append({'type': 'recipe', 'label': label, 'url': url_for('recipe_detail', recipe_id=ref)})
+        elif kind == KIND_CATEGORY:
+            results.append({'type': 'category', 'label': label, 'url': url_for('category', slug=ref)})
+        else:
+            results.append({'type': 'ingredient', 'label': label, 'url': url_for('search', q=ref)})
+    response = jsonify(results)
+    response.headers['Cache-Control'] = 'public, max-age=30'
+    return response
 
 # AI Recipe route - Deactivated for security reasons
 # @app.route('/ai-recipe', methods=['GET', 'POST'])
@@ -565,6 +1282,11 @@ def register():
         return redirect(url_for('index'))
     
     if request.method == 'POST':
+        ip = client_ip()
+        retry_after = register_ip_throttle.hit(ip) if ip else 0
+        if retry_after:
+            return throttled_response('register.html', retry_after, 'register_ip')
+        
         username = request.form.get('username')
         password = request.form.get('password')
         password_confirm = request.form.get('password_confirm')
@@ -598,17 +1320,30 @@ def login():
         return redirect(url_for('index'))
     
     if request.method == 'POST':
-        username = request.form.get('username')
+        username = request.form.get('username') or ''
         password = request.form.get('password')
+        ip = client_ip()
+        user_key = username.strip().lower()
+        
+        retry_after = login_ip_throttle.hit(ip) if ip else 0
+        if retry_after:
+            return throttled_response('login.html', retry_after, 'login_ip')
+        retry_after = login_user_throttle.hit(user_key)
+        if retry_after:
+            return throttled_response('login.html', retry_after, 'login_user')
         
         user = User.query.filter_by(username=username).first()
         
         if user and user.check_password(password):
+            login_user_throttle.success(user_key)
             login_user(user)
             next_page = request.args.get('next')
             flash('Giriş başarılı!', 'success')
             return redirect(next_page if next_page else url_for('index'))
         else:
+            if ip:
+                login_ip_throttle.failure(ip)
+            login_user_throttle.failure(user_key)
             flash('Kullanıcı adı veya şifre hatalı.', 'danger')
     
     return render_template('login.html')
@@ -627,8 +1362,13 @@ def logout():
 @login_required
 def my_recipes():
     """Kullanıcının tarifleri"""
-    recipes = Recipe.query.filter_by(user_id=current_user.id).order_by(Recipe.created_at.desc()).all()
-    return render_template('my_recipes.html', recipes=recipes)
+    recipes = (
+        Recipe.query.options(Recipe.card_columns())
+        .filter_by(user_id=current_user.id)
+        .order_by(Recipe.created_at.desc())
+        .all()
+    )
+    return render_template('my_recipes.html', recipes=recipes, card_stats=recipe_card_stats(recipes))
 
 @app.route('/recipe/add', methods=['GET', 'POST'])
 @login_required
@@ -648,7 +1388,12 @@ def add_recipe():
             flash('Başlık, açıklama ve kategori gerekli.', 'danger')
             return redirect(url_for('add_recipe'))
         
-        # Fotoğraf - URL veya dosya yükleme
+        uploads = uploaded_images()
+        if uploads is None:
+            return redirect(url_for('add_recipe'))
+        stored, rejected = uploads
+        
+        # Kapak fotoğrafı URL'si (yüklenen dosyalar galeriye eklenir)
         image_filename = None
         image_url = request.form.get('image_url', '').strip()
         
@@ -660,14 +1405,6 @@ def add_recipe():
             else:
                 # Eğer resolver bulamadıysa kullanıcının verdiği URL'i yine kaydet (kullanıcı manuel düzeltme yapabilir)
                 image_filename = image_url
-        elif 'image' in request.files:
-            # Dosya yüklenmişse kaydet
-            file = request.files['image']
-            if file and file.filename and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                image_filename = f"{timestamp}_{filename}"
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], image_filename))
         
         recipe = Recipe(
             title=title,
@@ -682,8 +1419,12 @@ def add_recipe():
             servings=servings
         )
         db.session.add(recipe)
+        attach_gallery_images(recipe, stored)
         db.session.commit()
+        suggestions.recipe_saved(recipe)
         
+        for message in rejected:
+            flash(f'Fotoğraf yüklenemedi - {message}', 'warning')
         flash('Tarif eklendi!', 'success')
         return redirect(url_for('recipe_detail', recipe_id=recipe.id))
     
@@ -701,16 +1442,14 @@ def edit_recipe(recipe_id):
         return redirect(url_for('recipe_detail', recipe_id=recipe_id))
     
     if request.method == 'POST':
-        # DEBUG: log incoming form/files to help diagnose remove_image issue
-        try:
-            print('\n--- DEBUG edit_recipe POST ---')
-            print('form:', dict(request.form))
-            print('files:', list(request.files.keys()))
-            print('remove_image raw:', request.form.get('remove_image'))
-        except Exception as e:
-            print('DEBUG logging error:', e)
-        # also show a short flash for quick UI feedback
-        flash(f"DEBUG: remove_image={request.form.get('remove_image')}", 'info')
+        app.logger.debug('edit_recipe POST', extra={
+            'recipe_id': recipe_id, 'fields': sorted(request.form), 'files': sorted(request.files),
+            'remove_image': request.form.get('remove_image'),
+        })
+        uploads = uploaded_images()
+        if uploads is None:
+            return redirect(url_for('edit_recipe', recipe_id=recipe_id))
+        stored, rejected = uploads
         recipe.title = request.form.get('title')
         recipe.content = request.form.get('content')
         recipe.ingredients = request.form.get('ingredients')
@@ -721,8 +1460,9 @@ def edit_recipe(recipe_id):
         recipe.servings = request.form.get('servings', type=int)
         
         # Fotoğraf silme kontrolü (checkbox değeri kontrolü daha sağlam)
+        removed_cover = None
         if request.form.get('remove_image') in ('1', 'on', 'true'):
-            recipe.image = None
+            removed_cover, recipe.image = recipe.image, None
         else:
             # Fotoğraf güncelleme - URL veya dosya yükleme
             image_url = request.form.get('image_url', '').strip()
@@ -734,17 +1474,29 @@ def edit_recipe(recipe_id):
                     recipe.image = resolved
                 else:
                     recipe.image = image_url
-            elif 'image' in request.files:
-                # Dosya yüklenmişse kaydet
-                file = request.files['image']
-                if file and file.filename and allowed_file(file.filename):
-                    filename = secure_filename(file.filename)
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    image_filename = f"{timestamp}_{filename}"
-                    file.save(os.path.join(app.config['UPLOAD_FOLDER'], image_filename))
-                    recipe.image = image_filename
+        
+        # Galeri: silinenler, sıra ve kapak seçimi
+        gallery = {image.id: image for image in recipe.images}
+        removed = set(request.form.getlist('remove_images', type=int))
+        removed.update(image.id for image in gallery.values() if image.filename == removed_cover)
+        for image_id in removed & gallery.keys():
+            image = gallery.pop(image_id)
+            if recipe.image == image.filename:
+                recipe.image = None
+            db.session.delete(image)
+        for image_id, image in gallery.items():
+            image.position = request.form.get(f'position_{image_id}', image.position, type=int)
+        cover_id = request.form.get('cover_image', type=int)
+        if cover_id in gallery:
+            recipe.image = gallery[cover_id].filename
+        elif not recipe.image and gallery:
+            recipe.image = min(gallery.values(), key=lambda image: (image.position, image.id)).filename
+        attach_gallery_images(recipe, stored)
         
         db.session.commit()
+        suggestions.recipe_saved(recipe)
+        for message in rejected:
+            flash(f'Fotoğraf yüklenemedi - {message}', 'warning')
         flash('Tarif güncellendi!', 'success')
         return redirect(url_for('recipe_detail', recipe_id=recipe_id))
     
@@ -761,8 +1513,9 @@ def delete_recipe(recipe_id):
         flash('Bu tarifi silme yetkiniz yok.', 'danger')
         return redirect(url_for('recipe_detail', recipe_id=recipe_id))
     
-    db.session.delete(recipe)
+    delete_recipes_where(Recipe.id == recipe_id)
     db.session.commit()
+    suggestions.recipe_deleted(recipe_id)
     flash('Tarif silindi.', 'info')
     return redirect(url_for('my_recipes'))
 
@@ -779,6 +1532,33 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Büyük listeler satır satır akıtılır; ~8 KB'lık parçalar halinde gönderilir
+ADMIN_STREAM_CHUNK = 8192
+ADMIN_YIELD_PER = 500
+
+
+def _buffered(chunks, size=ADMIN_STREAM_CHUNK):
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_listing(template_name, query, **context):
+    """Stream ``template_name`` with ``rows`` iterated from a server-side cursor.
+    Memory stays flat however many rows match: rows are plain tuples fetched
+    ``ADMIN_YIELD_PER`` at a time and rendered HTML leaves in small chunks.
+    """
+    # Flash mesajları oturumdan şimdi alınır; gövde akarken çerez artık değiştirilemez
+    get_flashed_messages()
+    rows = db.session.execute(query.execution_options(yield_per=ADMIN_YIELD_PER))
+    return app.response_class(_buffered(stream_template(template_name, rows=rows, **context)))
+
 @app.route('/admin')
 @login_required
 @admin_required
@@ -790,7 +1570,22 @@ def admin_dashboard():
         'categories': Category.query.count(),
         'comments': Comment.query.count()
     }
-    return render_template('admin/dashboard.html', stats=stats)
+    return render_template('admin/dashboard.html', stats=stats,
+                           throttle_stats=throttle_metrics.snapshot(),
+                           upload_sweep=last_upload_sweep)
+
+@app.route('/admin/uploads/sweep', methods=['POST'])
+@login_required
+@admin_required
+def admin_sweep_uploads():
+    """Admin - Sahipsiz yüklemeleri tara veya sil"""
+    dry_run = request.form.get('mode') != 'delete'
+    report = sweep_uploads(dry_run=dry_run)
+    if dry_run:
+        flash(f"{report['files']} sahipsiz dosya bulundu.", 'info')
+    else:
+        flash(f"{report['files']} sahipsiz dosya silindi.", 'success')
+    return redirect(url_for('admin_dashboard'))
 
 # ============= ADMIN - RECIPES =============
 
@@ -799,20 +1594,68 @@ def admin_dashboard():
 @admin_required
 def admin_recipes():
     """Admin - Tarifler listesi"""
-    recipes = Recipe.query.order_by(Recipe.created_at.desc()).all()
-    return render_template('admin/recipes.html', recipes=recipes)
+    query = (
+        db.select(Recipe.id, Recipe.title, Recipe.image, Recipe.created_at,
+                  Category.name.label('category_name'), User.username.label('author'))
+        .join(Category, Recipe.category_id == Category.id)
+        .join(User, Recipe.user_id == User.id)
+        .order_by(Recipe.created_at.desc())
+    )
+    return stream_listing('admin/recipes.html', query, categories=Category.query.all())
 
 @app.route('/admin/recipes/<int:recipe_id>/delete', methods=['POST'])
 @login_required
 @admin_required
 def admin_delete_recipe(recipe_id):
     """Admin - Tarif silme"""
-    recipe = Recipe.query.get_or_404(recipe_id)
-    db.session.delete(recipe)
+    Recipe.query.get_or_404(recipe_id)
+    delete_recipes_where(Recipe.id == recipe_id)
     db.session.commit()
+    suggestions.recipe_deleted(recipe_id)
     flash('Tarif silindi.', 'success')
     return redirect(url_for('admin_recipes'))
 
+@app.route('/admin/recipes/bulk', methods=['POST'])
+@login_required
+@admin_required
+def admin_bulk_recipes():
+    """Admin - Seçili tarifleri sil / başka kategoriye taşı (tek sorgu)"""
+    action = request.form.get('action')
+    ids = request.form.getlist('ids', type=int)
+    
+    if action == 'delete':
+        if not ids:
+            flash('Hiç tarif seçilmedi.', 'warning')
+            return redirect(url_for('admin_recipes'))
+        count = delete_recipes_where(Recipe.id.in_(ids))
+        db.session.commit()
+        suggestions.recipe_deleted(*ids)
+        flash(f'{count} tarif silindi.', 'success')
+        return redirect(url_for('admin_recipes'))
+    
+    if action in ('move', 'move_all'):
+        target = db.session.get(Category, request.form.get('target_category_id', type=int) or 0)
+        if target is None:
+            flash('Hedef kategori seçin.', 'danger')
+            return redirect(url_for('admin_recipes'))
+        if action == 'move_all':
+            criteria = Recipe.category_id == request.form.get('source_category_id', type=int)
+        elif ids:
+            criteria = Recipe.id.in_(ids)
+        else:
+            flash('Hiç tarif seçilmedi.', 'warning')
+            return redirect(url_for('admin_recipes'))
+        count = db.session.execute(
+            db.update(Recipe).where(criteria).values(category_id=target.id),
+            execution_options={'synchronize_session': False},
+        ).rowcount
+        db.session.commit()
+        flash(f'{count} tarif "{target.name}" kategorisine taşındı.', 'success')
+        return redirect(url_for('admin_recipes'))
+    
+    flash('Geçersiz işlem.', 'danger')
+    return redirect(url_for('admin_recipes'))
+
 # ============= ADMIN - CATEGORIES =============
 
 @app.route('/admin/categories')
@@ -844,6 +1687,7 @@ def admin_add_category():
         category = Category(name=name, slug=slug, description=description)
         db.session.add(category)
         db.session.commit()
+        suggestions.invalidate()
         
         flash('Kategori eklendi!', 'success')
         return redirect(url_for('admin_categories'))
@@ -863,6 +1707,7 @@ def admin_edit_category(category_id):
         category.description = request.form.get('description')
         
         db.session.commit()
+        suggestions.invalidate()
         flash('Kategori güncellendi!', 'success')
         return redirect(url_for('admin_categories'))
     
@@ -875,12 +1720,13 @@ def admin_delete_category(category_id):
     """Admin - Kategori silme"""
     category = Category.query.get_or_404(category_id)
     
-    if category.recipes:
+    if db.session.query(Recipe.query.filter_by(category_id=category.id).exists()).scalar():
         flash('Bu kategoriye ait tarifler var, önce onları silin veya taşıyın.', 'danger')
         return redirect(url_for('admin_categories'))
     
     db.session.delete(category)
     db.session.commit()
+    suggestions.invalidate()
     flash('Kategori silindi.', 'success')
     return redirect(url_for('admin_categories'))
 
@@ -891,8 +1737,14 @@ def admin_delete_category(category_id):
 @admin_required
 def admin_users():
     """Admin - Kullanıcılar listesi"""
-    users = User.query.all()
-    return render_template('admin/users.html', users=users)
+    recipe_count = db.select(db.func.count(Recipe.id)).where(Recipe.user_id == User.id).scalar_subquery()
+    comment_count = db.select(db.func.count(Comment.id)).where(Comment.user_id == User.id).scalar_subquery()
+    query = (
+        db.select(User.id, User.username, User.is_admin, User.created_at,
+                  recipe_count.label('recipe_count'), comment_count.label('comment_count'))
+        .order_by(User.id)
+    )
+    return stream_listing('admin/users.html', query)
 
 @app.route('/admin/users/<int:user_id>/toggle-admin', methods=['POST'])
 @login_required
@@ -907,6 +1759,7 @@ def admin_toggle_user_admin(user_id):
     
     user.is_admin = not user.is_admin
     db.session.commit()
+    user_cache.invalidate(user.id)
     flash(f"Kullanıcı {'admin yapıldı' if user.is_admin else 'admin değil'}", 'success')
     return redirect(url_for('admin_users'))
 
@@ -921,11 +1774,23 @@ def admin_delete_user(user_id):
         flash('Kendi hesabınızı silemezsiniz.', 'danger')
         return redirect(url_for('admin_users'))
     
-    db.session.delete(user)
+    delete_user_cascade(user.id)
     db.session.commit()
+    suggestions.invalidate()
     flash('Kullanıcı silindi.', 'success')
     return redirect(url_for('admin_users'))
 
+@app.route('/admin/users/<int:user_id>/delete-comments', methods=['POST'])
+@login_required
+@admin_required
+def admin_delete_user_comments(user_id):
+    """Admin - Kullanıcının tüm yorumlarını sil"""
+    user = User.query.get_or_404(user_id)
+    count = delete_comments_where(Comment.user_id == user.id)
+    db.session.commit()
+    flash(f'{user.username} kullanıcısının {count} yorumu silindi.', 'success')
+    return redirect(request.referrer or url_for('admin_users'))
+
 # ============= ADMIN - COMMENTS =============
 
 @app.route('/admin/comments')
@@ -933,8 +1798,14 @@ def admin_delete_user(user_id):
 @admin_required
 def admin_comments():
     """Admin - Yorumlar listesi"""
-    comments = Comment.query.order_by(Comment.created_at.desc()).all()
-    return render_template('admin/comments.html', comments=comments)
+    query = (
+        db.select(Comment.id, Comment.body, Comment.rating, Comment.created_at, Comment.recipe_id,
+                  Recipe.title.label('recipe_title'), User.username)
+        .join(Recipe, Comment.recipe_id == Recipe.id)
+        .join(User, Comment.user_id == User.id)
+        .order_by(Comment.created_at.desc())
+    )
+    return stream_listing('admin/comments.html', query)
 
 @app.route('/admin/comments/<int:comment_id>/delete', methods=['POST'])
 @login_required
@@ -942,11 +1813,128 @@ def admin_comments():
 def admin_delete_comment(comment_id):
     """Admin - Yorum silme"""
     comment = Comment.query.get_or_404(comment_id)
-    db.session.delete(comment)
+    delete_comments_where(Comment.id == comment.id)
     db.session.commit()
     flash('Yorum silindi.', 'success')
     return redirect(url_for('admin_comments'))
 
+@app.route('/admin/comments/bulk-delete', methods=['POST'])
+@login_required
+@admin_required
+def admin_bulk_delete_comments():
+    """Admin - Seçili yorumları sil (tek sorgu)"""
+    ids = request.form.getlist('ids', type=int)
+    if not ids:
+        flash('Hiç yorum seçilmedi.', 'warning')
+        return redirect(url_for('admin_comments'))
+    count = delete_comments_where(Comment.id.in_(ids))
+    db.session.commit()
+    flash(f'{count} yorum silindi.', 'success')
+    return redirect(url_for('admin_comments'))
+
+# ============= ADMIN - BULK DATA =============
+
+@app.route('/admin/data/export/<any(categories, recipes, comments):entity>.<any(jsonl, csv):fmt>')
+@login_required
+@admin_required
+def admin_export_data(entity, fmt):
+    """Admin - Toplu dışa aktarım (akış halinde indirme)"""
+    lines = bulk.write_records(bulk.export_records(entity), fmt, entity)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return app.response_class(stream_with_context(lines), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename={entity}.{fmt}'
+    })
+
+@app.route('/admin/data/import', methods=['POST'])
+@login_required
+@admin_required
+def admin_import_data():
+    """Admin - Toplu içe aktarım"""
+    entity = request.form.get('entity')
+    file = request.files.get('file')
+    if entity not in bulk.ENTITIES or not file or not file.filename:
+        flash('Veri türü ve dosya gerekli.', 'danger')
+        return redirect(url_for('admin_dashboard'))
+    
+    fmt = 'csv' if file.filename.lower().endswith('.csv') else 'jsonl'
+    stream = io.TextIOWrapper(file.stream, encoding='utf-8-sig')
+    try:
+        result = bulk.import_records(entity, bulk.read_records(stream, fmt),
+                                     default_author=current_user.username)
+    except (ValueError, KeyError) as e:
+        db.session.rollback()
+        flash(f'İçe aktarım hatası: {e}', 'danger')
+        return redirect(url_for('admin_dashboard'))
+    
+    suggestions.invalidate()
+    flash(f"{result['read']} kayıt okundu, {result['inserted']} eklendi, {result['skipped']} atlandı.", 'success')
+    return redirect(url_for('admin_dashboard'))
+
+# ============= ADMIN - PROFILER =============
+
+# İşçi içi örnekleyici profiler; aynı anda tek profil, süre PROFILER_MAX_SECONDS ile sınırlı
+sampling_profiler = SamplingProfiler(
+    max_seconds=float(os.getenv('PROFILER_MAX_SECONDS', 60)),
+    max_requests=int(os.getenv('PROFILER_MAX_REQUESTS', 1000)),
+)
+PROFILER_ENDPOINTS = ('admin_profile_start', 'admin_profile_result')
+
+
+@app.before_request
+def profiler_enter():
+    sampling_profiler.before_request(request.endpoint)
+
+
+@app.teardown_request
+def profiler_leave(exc=None):
+    sampling_profiler.teardown_request()
+
+
+def profile_response(session, fmt):
+    headers = {'X-Worker-PID': str(os.getpid())}
+    if fmt == 'status' or not session.finished:
+        return jsonify(session.status()), 200 if session.finished else 202, headers
+    if fmt == 'speedscope':
+        headers['Content-Disposition'] = f'attachment; filename=profile-{os.getpid()}.speedscope.json'
+        return app.response_class(json.dumps(session.speedscope()), mimetype='application/json', headers=headers)
+    return app.response_class(session.collapsed(), mimetype='text/plain', headers=headers)
+
+@app.route('/admin/profile', methods=['POST'])
+@login_required
+@admin_required
+def admin_profile_start():
+    """Admin - Bu işçide profil başlat (süre veya bir uç noktanın sonraki N isteği)"""
+    endpoint = request.values.get('endpoint') or None
+    if endpoint is not None and endpoint not in app.view_functions:
+        return jsonify({'error': f'Unknown endpoint: {endpoint}'}), 400
+    fmt = request.values.get('format', 'collapsed')
+    if fmt not in ('collapsed', 'speedscope', 'status'):
+        return jsonify({'error': f'Unknown format: {fmt}'}), 400
+    try:
+        session = sampling_profiler.start(
+            seconds=request.values.get('seconds', 10, type=float),
+            interval=request.values.get('interval_ms', 5, type=float) / 1000,
+            endpoint=endpoint,
+            max_requests=request.values.get('requests', type=int),
+            exclude=PROFILER_ENDPOINTS,
+        )
+    except ProfilerBusy as e:
+        return jsonify({'error': str(e), 'pid': os.getpid()}), 409
+    # Çok iş parçacıklı işçilerde sonucu aynı istekte beklemek mümkün
+    if request.values.get('wait') in ('1', 'true'):
+        session.wait(session.seconds + 1)
+    return profile_response(session, fmt)
+
+@app.route('/admin/profile')
+@login_required
+@admin_required
+def admin_profile_result():
+    """Admin - Bu işçideki çalışan ya da son profilin sonucu"""
+    session = sampling_profiler.session or sampling_profiler.last
+    if session is None:
+        return jsonify({'error': 'No profile in this worker.', 'pid': os.getpid()}), 404
+    return profile_response(session, request.args.get('format', 'collapsed'))
+
 # ============= ADMIN - PAGES =============
 
 @app.route('/admin/pages')
@@ -1013,6 +2001,197 @@ def admin_delete_page(page_id):
     flash('Sayfa silindi.', 'success')
     return redirect(url_for('admin_pages'))
 
+# ============= SITEMAP & FEEDS =============
+
+SITEMAP_MAX_URLS = 50000
+SITEMAP_SEGMENT_SIZE = 50000  # segment başına tarif id aralığı
+FEED_SIZE = 50
+SITEMAP_PAGE_ENDPOINTS = ('index', 'about', 'testimonials', 'contact', 'calorie_calculator')
+
+# (segment no, site kökü) -> ((adet, en son updated_at), <url> XML'i). Bir segment
+# 50.000 URL'ye kadar birkaç MB tutar; yalnızca son kullanılan birkaçı saklanır
+sitemap_segment_cache = FragmentCache(maxsize=int(os.getenv('SITEMAP_CACHE_SEGMENTS', 2)), ttl=float('inf'))
+
+
+def _lastmod(value):
+    return f'<lastmod>{value.strftime("%Y-%m-%d")}</lastmod>' if value else ''
+
+
+def _xml_url(loc, lastmod=None):
+    return f'<url><loc>{xml_escape(loc)}</loc>{_lastmod(lastmod)}</url>\n'
+
+
+def _category_slugs():
+    return db.session.scalars(db.select(Category.slug).order_by(Category.id)).all()
+
+
+def _sitemap_page_urls(slugs):
+    for endpoint in SITEMAP_PAGE_ENDPOINTS:
+        yield _xml_url(url_for(endpoint, _external=True))
+    for slug in slugs:
+        yield _xml_url(url_for('category', slug=slug, _external=True))
+
+
+def _recipe_segment_bounds(n):
+    return Recipe.id >= n * SITEMAP_SEGMENT_SIZE, Recipe.id < (n + 1) * SITEMAP_SEGMENT_SIZE
+
+
+def _recipe_segment_fingerprint(n):
+    return tuple(db.session.execute(
+        db.select(db.func.count(Recipe.id), db.func.max(Recipe.updated_at)).where(*_recipe_segment_bounds(n))
+    ).one())
+
+
+def _sitemap_recipe_urls(n, fingerprint, chunk_size=1000):
+    """Yield the <url> entries of recipe segment ``n``.
+    Rows come from a server-side cursor; the finished segment is cached and
+    only regenerated when ``fingerprint`` shows a recipe in its id range was
+    added, edited or deleted.
+    """
+    key = (n, request.url_root)
+    cached = sitemap_segment_cache.get(key)
+    if cached and cached[0] == fingerprint:
+        yield cached[1]
+        return
+    parts, chunk = [], []
+    rows = db.session.execute(
+        db.select(Recipe.id, Recipe.updated_at).where(*_recipe_segment_bounds(n))
+        .order_by(Recipe.id).execution_options(yield_per=chunk_size)
+    )
+    for recipe_id, updated_at in rows:
+        chunk.append(_xml_url(url_for('recipe_detail', recipe_id=recipe_id, _external=True), updated_at))
+        if len(chunk) >= chunk_size:
+            parts.append(''.join(chunk))
+            chunk = []
+            yield parts[-1]
+    parts.append(''.join(chunk))
+    yield parts[-1]
+    sitemap_segment_cache.set(key, (fingerprint, ''.join(parts)))
+
+
+def _recipe_segment_count():
+    max_id = db.session.scalar(db.select(db.func.max(Recipe.id))) or 0
+    return max_id // SITEMAP_SEGMENT_SIZE + 1
+
+
+def _xml_stream(generate, *version):
+    """Stream ``generate()`` as XML with an ETag derived from ``version``.
+    The tag lets clients revalidate with a 304 and lets the compression
+    middleware answer from its cache without generating the body at all.
+    """
+    if not version:
+        return app.response_class(stream_with_context(generate()), mimetype='application/xml')
+    etag = hashlib.blake2b(repr((request.url_root,) + version).encode(), digest_size=16).hexdigest()
+    # make_conditional akışı Content-Length için belleğe okurdu; 304 elle
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(stream_with_context(generate()), mimetype='application/xml')
+    response.set_etag(etag)
+    return response
+
+
+@app.route('/sitemap.xml')
+def sitemap():
+    """Sitemap; 50.000 URL'yi aşınca sitemap index döner"""
+    urlset_open = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    fingerprints = [_recipe_segment_fingerprint(n) for n in range(_recipe_segment_count())]
+    slugs = _category_slugs()
+    total = sum(count for count, _ in fingerprints) + len(SITEMAP_PAGE_ENDPOINTS) + len(slugs)
+
+    if total <= SITEMAP_MAX_URLS:
+        def generate():
+            yield urlset_open
+            yield from _sitemap_page_urls(slugs)
+            for n, fingerprint in enumerate(fingerprints):
+                yield from _sitemap_recipe_urls(n, fingerprint)
+            yield '</urlset>\n'
+        return _xml_stream(generate, fingerprints, slugs)
+
+    def generate():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        yield f'<sitemap><loc>{xml_escape(url_for("sitemap_pages", _external=True))}</loc></sitemap>\n'
+        for n, (count, lastmod) in enumerate(fingerprints):
+            if not count:
+                continue
+            yield (f'<sitemap><loc>{xml_escape(url_for("sitemap_recipes", n=n, _external=True))}</loc>'
+                   f'{_lastmod(lastmod)}</sitemap>\n')
+        yield '</sitemapindex>\n'
+    return _xml_stream(generate, fingerprints, slugs)
+
+
+@app.route('/sitemap-pages.xml')
+def sitemap_pages():
+    slugs = _category_slugs()
+
+    def generate():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        yield from _sitemap_page_urls(slugs)
+        yield '</urlset>\n'
+    return _xml_stream(generate, slugs)
+
+
+@app.route('/sitemap-recipes-<int:n>.xml')
+def sitemap_recipes(n):
+    if n >= _recipe_segment_count():
+        abort(404)
+    fingerprint = _recipe_segment_fingerprint(n)
+
+    def generate():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        yield from _sitemap_recipe_urls(n, fingerprint)
+        yield '</urlset>\n'
+    return _xml_stream(generate, n, fingerprint)
+
+
+@app.route('/robots.txt')
+def robots_txt():
+    return app.response_class(f"User-agent: *\nSitemap: {url_for('sitemap', _external=True)}\n",
+                              mimetype='text/plain')
+
+
+@app.route('/category/<slug>/feed.<any(rss, atom):fmt>')
+def category_feed(slug, fmt):
+    """Kategori RSS/Atom beslemesi (en yeni tarifler)"""
+    category = Category.query.filter_by(slug=slug).first_or_404()
+    rows = db.session.execute(
+        db.select(Recipe.id, Recipe.title, Recipe.content, Recipe.created_at, Recipe.updated_at)
+        .where(Recipe.category_id == category.id)
+        .order_by(Recipe.created_at.desc()).limit(FEED_SIZE)
+        .execution_options(yield_per=FEED_SIZE)
+    )
+    feed_url = url_for('category_feed', slug=slug, fmt=fmt, _external=True)
+    page_url = url_for('category', slug=slug, _external=True)
+    title = xml_escape(f'{category.name} - Nefis Yemekler')
+
+    def generate_rss():
+        yield ('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>\n'
+               f'<title>{title}</title><link>{xml_escape(page_url)}</link>'
+               f'<description>{xml_escape(category.description or category.name)}</description>\n')
+        for recipe_id, recipe_title, content, created_at, _ in rows:
+            link = xml_escape(url_for('recipe_detail', recipe_id=recipe_id, _external=True))
+            yield (f'<item><title>{xml_escape(recipe_title)}</title><link>{link}</link><guid>{link}</guid>'
+                   f'<pubDate>{format_datetime(created_at.replace(tzinfo=timezone.utc), usegmt=True) if created_at else ""}</pubDate>'
+                   f'<description>{xml_escape(content)}</description></item>\n')
+        yield '</channel></rss>\n'
+
+    def generate_atom():
+        yield ('<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n'
+               f'<title>{title}</title><id>{xml_escape(feed_url)}</id>'
+               f'<link rel="self" href="{xml_escape(feed_url)}"/><link href="{xml_escape(page_url)}"/>'
+               f'<updated>{datetime.utcnow().isoformat(timespec="seconds")}Z</updated>'
+               '<author><name>Nefis Yemekler</name></author>\n')
+        for recipe_id, recipe_title, content, created_at, updated_at in rows:
+            link = xml_escape(url_for('recipe_detail', recipe_id=recipe_id, _external=True))
+            updated = (updated_at or created_at or datetime.utcnow()).isoformat(timespec='seconds')
+            yield (f'<entry><title>{xml_escape(recipe_title)}</title><id>{link}</id><link href="{link}"/>'
+                   f'<updated>{updated}Z</updated><summary>{xml_escape(content)}</summary></entry>\n')
+        yield '</feed>\n'
+
+    mimetype = 'application/rss+xml' if fmt == 'rss' else 'application/atom+xml'
+    generate = generate_rss if fmt == 'rss' else generate_atom
+    return app.response_class(stream_with_context(generate()), mimetype=mimetype)
+
 # ============= ERROR HANDLERS =============
 
 @app.errorhandler(404)
@@ -1031,6 +2210,38 @@ def inject_categories():
     """Tüm template'lerde kategorileri kullanılabilir yap"""
     return dict(all_categories=Category.query.all())
 
+# ============= STARTUP =============
+
+# İlk isteklerin çoğu bu sayfalara gelir; şablonları bellekte hazır tutulur
+WARM_UP_TEMPLATES = ('base.html', 'index.html', 'category.html', 'recipe_detail.html', '_comments.html',
+                     '_ranked_recipes.html', 'search.html')
+
+
+def compile_templates():
+    """Compile every template, filling the bytecode cache; returns the count."""
+    names = [name for name in app.jinja_env.list_templates() if name.endswith('.html')]
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def warm_up():
+    """Prime DB connections, SQL compilation and hot templates before serving.
+    Renders the home page once through the test client so the first real
+    visitor after a cold start doesn't pay for it. Returns elapsed seconds.
+    """
+    started = time.monotonic()
+    for name in WARM_UP_TEMPLATES:
+        app.jinja_env.get_template(name)
+    try:
+        with app.app_context():
+            for key in app.config.get('DATABASE_REPLICA_KEYS') or ():
+                db.engines[key].connect().close()
+        app.test_client().get('/')
+    except Exception:
+        app.logger.exception('Warm-up failed')
+    return time.monotonic() - started
+
 # ============= CLI COMMANDS =============
 
 @app.cli.command()
@@ -1039,6 +2250,75 @@ def init_db():
     db.create_all()
     print('Database initialized.')
 
+@app.cli.command('sweep-uploads')
+@click.option('--dry-run', is_flag=True, help='Sadece raporla, dosya silme.')
+@click.option('--grace', type=int, default=None, help='Bu kadar saniyeden yeni dosyaları atla.')
+def sweep_uploads_command(dry_run, grace):
+    """Delete uploaded files no recipe or image references."""
+    report = sweep_uploads(dry_run=dry_run, grace_seconds=grace)
+    action = 'would be removed' if dry_run else 'removed'
+    print(f"{report['files']} orphaned file(s) {action}, {report['bytes']} bytes reclaimable.")
+
+@app.cli.command('refresh-trending')
+def refresh_trending_command():
+    """Recompute trending scores and weekly view counts now."""
+    count = view_counter.refresh_trending()
+    print(f'Trending scores refreshed for {count} recipe(s).')
+
+def prune_change_feed(before=None):
+    """Prune the change feed to CHANGE_FEED_RETENTION_HOURS (or up to id ``before``)."""
+    return prune_changes(before, retention=timedelta(hours=app.config['CHANGE_FEED_RETENTION_HOURS']))
+
+periodic_jobs.add('prune-change-feed', app.config['CHANGE_FEED_PRUNE_HOURS'] * 3600, prune_change_feed)
+
+@app.cli.command('prune-changes')
+@click.option('--before', type=int, default=None, help='Varsayılan: CHANGE_FEED_RETENTION_HOURS saatten eski olaylar.')
+def prune_changes_command(before):
+    """Delete old change events, keeping each record's latest one."""
+    deleted = prune_change_feed(before)
+    print(f'{deleted} change event(s) pruned, feed head at {change_feed_head()}.')
+
+@app.cli.command('compile-templates')
+def compile_templates_command():
+    """Precompile Jinja templates into the bytecode cache."""
+    print(f"{compile_templates()} template(s) compiled into {app.config['JINJA_BYTECODE_CACHE_DIR']}.")
+
+def _data_format(path, fmt):
+    if fmt:
+        return fmt
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+@app.cli.command('import-data')
+@click.argument('entity', type=click.Choice(bulk.ENTITIES))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(bulk.FORMATS), help='Varsayılan: dosya uzantısından.')
+@click.option('--chunk-size', type=int, default=1000, show_default=True)
+@click.option('--author', default='admin', show_default=True, help='Bilinmeyen yazarlar için kullanıcı.')
+def import_data_command(entity, path, fmt, chunk_size, author):
+    """Import categories, recipes or comments from JSONL/CSV."""
+    started = time.monotonic()
+
+    def progress(result):
+        rate = result['read'] / max(time.monotonic() - started, 1e-9)
+        click.echo(f"\r{result['read']} read, {result['inserted']} inserted ({rate:.0f} rows/s)", nl=False, err=True)
+
+    with click.open_file(path, encoding='utf-8-sig') as stream:
+        result = bulk.import_records(entity, bulk.read_records(stream, _data_format(path, fmt)),
+                                     chunk_size=chunk_size, default_author=author, progress=progress)
+    click.echo(err=True)
+    print(f"Imported {result['inserted']} {entity}, skipped {result['skipped']} "
+          f"in {time.monotonic() - started:.1f}s.")
+
+@app.cli.command('export-data')
+@click.argument('entity', type=click.Choice(bulk.ENTITIES))
+@click.argument('path', default='-', type=click.Path(dir_okay=False, writable=True, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(bulk.FORMATS), help='Varsayılan: dosya uzantısından.')
+def export_data_command(entity, path, fmt):
+    """Export categories, recipes or comments as JSONL/CSV."""
+    with click.open_file(path, 'w', encoding='utf-8') as out:
+        for line in bulk.write_records(bulk.export_records(entity), _data_format(path, fmt), entity):
+            out.write(line)
+
 if __name__ == '__main__':
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     with app.app_context():
@@ -0,0 +1,81 @@
+"""Yanıt sıkıştırmanın hat üzerindeki bayt ve CPU karşılığı, rota başına.
+
+Uygulamayı süreç içinde (Flask test istemcisi, ağ yok) çağırır. Her rota ve
+kodlama için gövde boyutunu ve istek başına CPU süresini iki durumda ölçer:
+sıkıştırma önbelleği boşken (her istek sıkıştırır) ve doluyken (aynı gövde
+önceden sıkıştırılmış). ``compress ms`` yalnızca sıkıştırmanın kendisidir.
+
+    python3 bench_compression.py --repeat 20
+    python3 bench_compression.py / /category/corbalar --no-admin
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault('DB_INIT_ON_STARTUP', '0')
+
+DEFAULT_PATHS = ('/', '/category/corbalar', '/admin/recipes')
+
+
+def cpu_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.process_time()
+        func()
+        times.append(time.process_time() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--admin', default='admin:admin123', help='/admin yolları için kullanıcı:şifre.')
+    parser.add_argument('--no-admin', action='store_true')
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app import app
+    from compression import available_encodings, compress
+
+    middleware = app.extensions.get('compression')
+    if middleware is None:
+        print('COMPRESS_ENABLED=0: nothing to measure')
+        return 1
+    client = app.test_client()
+    if not args.no_admin:
+        username, _, password = args.admin.partition(':')
+        client.post('/login', data={'username': username, 'password': password})
+        client.get('/')  # giriş flash mesajı ölçülen ilk sayfaya düşmesin
+    paths = [p for p in args.paths if not (args.no_admin and p.startswith('/admin'))]
+
+    print(f"gzip level {middleware.levels['gzip']}, brotli quality {middleware.levels['br']}, "
+          f'min size {middleware.min_size} B')
+    print(f"{'path':<22}{'encoding':<10}{'bytes':>11}{'ratio':>7}{'compress ms':>13}"
+          f"{'req ms (cold)':>15}{'req ms (cached)':>17}")
+    for path in paths:
+        raw = client.get(path, headers={'Accept-Encoding': 'identity'}).data
+        for encoding in ('identity',) + available_encodings():
+            def request():
+                return client.get(path, headers={'Accept-Encoding': encoding}).data
+
+            def cold():
+                middleware.cache.clear()
+                request()
+
+            body = request()
+            cold_ms = cpu_ms(cold, args.repeat)
+            cached_ms = cpu_ms(request, args.repeat)
+            if encoding == 'identity':
+                compress_ms = 0.0
+            else:
+                compress_ms = cpu_ms(lambda: compress(raw, encoding, middleware.levels[encoding]), args.repeat)
+            print(f'{path:<22}{encoding:<10}{len(body):>11}{len(body) / max(len(raw), 1):>7.2f}'
+                  f'{compress_ms:>13.2f}{cold_ms:>15.1f}{cached_ms:>17.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""resolve_image_url karşılaştırması: eski (tüm gövde + regex) ve akışlı tarama.
+
+Büyük yerel fixture dosyaları üretir, bunları localhost'ta bir HTTP sunucusuyla
+sunar ve her senaryo için iki yöntemin süresini, Python bellek tepe noktasını
+ve bulduğu adresi yazar.
+
+    python3 bench_image_probe.py --size-mb 8
+"""
+import argparse
+import functools
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urljoin
+
+os.environ.setdefault('DB_INIT_ON_STARTUP', '0')
+
+FILLER = '<p>Tereyağını eritin, unu ekleyip kokusu çıkana kadar kavurun.</p>\n'
+SCRIPT = '<script>var tpl = \'<img src="/js-template.png">\';</script>\n'
+
+
+def legacy_resolve(candidate_url):
+    """The previous implementation, kept here for comparison."""
+    import requests
+    try:
+        resp = requests.head(candidate_url, allow_redirects=True, timeout=5)
+        if resp.headers.get('Content-Type', '').startswith('image'):
+            return resp.url
+        resp = requests.get(candidate_url, allow_redirects=True, timeout=6)
+        if resp.headers.get('Content-Type', '').startswith('image'):
+            return resp.url
+        html = resp.text or ''
+        m = re.search(r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']', html, re.I)
+        if not m:
+            m = re.search(r'<meta[^>]+name=["\']twitter:image["\'][^>]+content=["\']([^"\']+)["\']', html, re.I)
+        if m:
+            return urljoin(resp.url, m.group(1))
+        m = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', html, re.I)
+        if m:
+            return urljoin(resp.url, m.group(1))
+    except Exception:
+        return None
+    return None
+
+
+def write_fixtures(folder, size):
+    body = FILLER * (size // len(FILLER.encode()))
+    fixtures = {
+        # og:image <head> içinde, ardından büyük bir gövde
+        'og-in-head.html': f'<html><head><title>t</title><meta property="og:image" content="/og.jpg"></head>'
+                           f'<body>{body}</body></html>',
+        # meta yok, <head> içinde <img> içeren bir script, asıl <img> gövdenin başında
+        'img-in-body.html': f'<html><head>{SCRIPT}</head><body><img src="/first.jpg">{body}</body></html>',
+        # hiç görsel yok: sınır kadar okunur
+        'no-image.html': f'<html><head></head><body>{body}</body></html>',
+    }
+    for name, text in fixtures.items():
+        with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+    # HTML olmayan büyük dosya ve HTML diye sunulan ikili veri
+    for name in ('archive.bin', 'mislabeled.htm'):
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(os.urandom(size))
+    return list(fixtures) + ['archive.bin', 'mislabeled.htm']
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    extensions_map = {'.html': 'text/html; charset=utf-8', '.htm': 'text/html', '.bin': 'application/octet-stream'}
+
+    def log_message(self, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        try:
+            super().copyfile(source, outputfile)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # istemci erken kapattı
+
+
+def measure(func, url, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(url)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    func(url)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, statistics.median(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=float, default=8, help='Fixture boyutu.')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app import app, resolve_image_url
+
+    with tempfile.TemporaryDirectory() as folder:
+        names = write_fixtures(folder, int(args.size_mb * 1024 * 1024))
+        server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(FixtureHandler, directory=folder))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_address[1]}/'
+        print(f"Fixtures: {args.size_mb:g} MB, cap {app.config['IMAGE_PROBE_MAX_BYTES'] // 1024} KB")
+        print(f"{'fixture':<18}{'method':<8}{'ms':>8}{'peak MB':>9}  result")
+        try:
+            for name in names:
+                for label, func in (('legacy', legacy_resolve), ('stream', resolve_image_url)):
+                    result, elapsed, peak = measure(func, base + name, args.repeat)
+                    shown = result.replace(base, '/') if result else None
+                    print(f'{name:<18}{label:<8}{elapsed * 1000:>8.1f}{peak / 1e6:>9.2f}  {shown}')
+        finally:
+            server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Gunicorn yapılandırmalarını karşılaştıran yük testi.
+
+Her yapılandırma için gunicorn'u ayrı bir süreçte başlatır, ``--concurrency``
+eşzamanlı istemciyle ``--seconds`` boyunca sayfaları ister ve saniyedeki istek
+sayısını, gecikme yüzdeliklerini ve süreç ağacının toplam belleğini raporlar.
+Bellek PSS'tir (paylaşılan sayfalar süreçlere bölünür), böylece ``preload_app``
+ile copy-on-write paylaşımı görünür. Veritabanı önceden hazırlanmış olmalıdır (build.sh).
+
+    python3 bench_server.py --seconds 15 --concurrency 16
+    python3 bench_server.py --only gthread,gevent
+"""
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from urllib.error import URLError
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# ad -> (gunicorn argümanları, ortam değişkenleri)
+CONFIGS = {
+    # Eski başlatma komutu: yapılandırma dosyası yok, tek sync işçi
+    'bare': (['-c', '/dev/null', '--bind', '{bind}', 'app:app'], {}),
+    'sync': (['-c', 'gunicorn.conf.py', 'app:app'], {'GUNICORN_WORKER_CLASS': 'sync'}),
+    'gthread': (['-c', 'gunicorn.conf.py', 'app:app'], {'GUNICORN_WORKER_CLASS': 'gthread'}),
+    'nopreload': (['-c', 'gunicorn.conf.py', 'app:app'], {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_PRELOAD': '0'}),
+    'gevent': (['-c', 'gunicorn.conf.py', 'app:app'], {'GUNICORN_WORKER_CLASS': 'gevent'}),
+}
+DEFAULT_PATHS = ('/', '/recipe/1', '/category/corbalar', '/search?q=tavuk')
+
+
+def memory_mb(pid):
+    """Proportional set size of ``pid`` and all of its children, in MB."""
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/smaps_rollup') as f:
+                total += int(next(line for line in f if line.startswith('Pss:')).split()[1])
+            with open(f'/proc/{current}/task/{current}/children') as f:
+                pending.extend(int(child) for child in f.read().split())
+        except (OSError, StopIteration):
+            continue
+    return total / 1024
+
+
+def wait_ready(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            return True
+        except (URLError, ConnectionError):
+            time.sleep(0.2)
+    return False
+
+
+def load(base_url, paths, concurrency, seconds):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def client(offset):
+        i = offset
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                urllib.request.urlopen(base_url + paths[i % len(paths)], timeout=30).read()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+            i += 1
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def bench(name, args, port):
+    gunicorn_args, env = CONFIGS[name]
+    bind = f'127.0.0.1:{port}'
+    env = dict(os.environ, PORT=str(port), WARM_UP_ON_START='1', DB_INIT_ON_STARTUP='0', **env)
+    if args.workers:
+        env['WEB_CONCURRENCY'] = str(args.workers)
+    command = [sys.executable, '-m', 'gunicorn'] + [a.format(bind=bind) for a in gunicorn_args]
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base_url = f'http://{bind}'
+        if not wait_ready(base_url + '/'):
+            return None
+        load(base_url, args.paths, args.concurrency, 2)  # ısınma turu
+        latencies, errors = load(base_url, args.paths, args.concurrency, args.seconds)
+        latencies.sort()
+        return {
+            'rps': len(latencies) / args.seconds,
+            'p50': statistics.median(latencies) * 1000 if latencies else 0,
+            'p95': latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0,
+            'errors': errors,
+            'memory': memory_mb(server.pid),
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', default=','.join(CONFIGS), help='Virgülle ayrılmış yapılandırma adları.')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, help='WEB_CONCURRENCY (varsayılan: otomatik).')
+    parser.add_argument('--port', type=int, default=18000)
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+    args = parser.parse_args()
+
+    print(f"{'config':<10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}{'PSS MB':>9}")
+    for offset, name in enumerate(args.only.split(',')):
+        result = bench(name, args, args.port + offset)
+        if result is None:
+            print(f'{name:<10} failed to start')
+            continue
+        print(f"{name:<10}{result['rps']:>9.0f}{result['p50']:>9.1f}{result['p95']:>9.1f}"
+              f"{result['errors']:>8}{result['memory']:>9.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
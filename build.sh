@@ -8,9 +8,12 @@ pip install -r requirements.txt
 echo "=== Creating directories ==="
 mkdir -p static/uploads
 
+# Build sırasında import'ta DB hazırlığı yapılmasın; aşağıda açıkça yapılıyor
+export DB_INIT_ON_STARTUP=0
+
 echo "=== Initializing database ==="
 python3 -c "
-from app import app, db
+from app import app, db, init_database
 with app.app_context():
     try:
         db.create_all()
@@ -18,8 +21,12 @@ with app.app_context():
     except Exception as e:
         print(f'✗ Database initialization error: {e}')
         raise
+    init_database()
 "
 
+echo "=== Precompiling templates ==="
+flask --app app compile-templates
+
 echo "=== Seeding database ==="
 if [ -f seed.py ]; then
     python3 seed.py
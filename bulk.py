@@ -0,0 +1,270 @@
+"""Toplu içe/dışa aktarım - tarifler, kategoriler ve yorumlar (JSONL / CSV).
+
+Kayıtlar satır satır okunur/yazılır ve parça parça (chunk) eklenir; kategori
+slug'ları ve yazar kullanıcı adları her satırda sorgu atmak yerine bir kez
+yüklenen sözlüklerden çözülür. Aynı dosyayı tekrar içe aktarmak yeni kayıt
+oluşturmaz: ``id`` verilmişse id'ye, verilmemişse doğal anahtara bakılır.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+
+from models import db, User, Category, Recipe, Comment, make_excerpt
+from changefeed import record_changes, INSERT
+
+ENTITIES = ('categories', 'recipes', 'comments')
+FORMATS = ('jsonl', 'csv')
+
+FIELDS = {
+    'categories': ('slug', 'name', 'description'),
+    'recipes': ('id', 'title', 'content', 'ingredients', 'instructions', 'prep_time', 'cook_time',
+                'servings', 'image', 'category', 'author', 'created_at'),
+    'comments': ('id', 'recipe_id', 'author', 'body', 'rating', 'created_at'),
+}
+INT_FIELDS = {'id', 'prep_time', 'cook_time', 'servings', 'recipe_id', 'rating'}
+
+
+# ============= READING / WRITING =============
+
+def read_records(stream, fmt):
+    """Yield dicts from a text stream of JSONL lines or CSV rows."""
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key: (value if value != '' else None) for key, value in row.items()}
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _coerce(record, fields):
+    values = {}
+    for field in fields:
+        value = record.get(field)
+        if value is not None and field in INT_FIELDS:
+            value = int(value)
+        elif isinstance(value, str) and field == 'created_at':
+            value = datetime.fromisoformat(value)
+        values[field] = value
+    return values
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def write_records(records, fmt, entity):
+    """Yield the serialized form of ``records`` one line at a time."""
+    fields = FIELDS[entity]
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for record in records:
+            writer.writerow([_json_default(v) if isinstance(v, datetime) else v for v in
+                             (record.get(f) for f in fields)])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for record in records:
+            yield json.dumps(record, ensure_ascii=False, default=_json_default) + '\n'
+
+
+# ============= EXPORT =============
+
+def export_records(entity, chunk_size=1000):
+    """Yield export dicts for ``entity`` from a server-side cursor."""
+    if entity == 'categories':
+        query = db.select(Category.slug, Category.name, Category.description).order_by(Category.id)
+    elif entity == 'recipes':
+        query = (
+            db.select(Recipe.id, Recipe.title, Recipe.content, Recipe.ingredients, Recipe.instructions,
+                      Recipe.prep_time, Recipe.cook_time, Recipe.servings, Recipe.image,
+                      Category.slug.label('category'), User.username.label('author'), Recipe.created_at)
+            .join(Category, Recipe.category_id == Category.id)
+            .join(User, Recipe.user_id == User.id)
+            .order_by(Recipe.id)
+        )
+    else:
+        query = (
+            db.select(Comment.id, Comment.recipe_id, User.username.label('author'), Comment.body,
+                      Comment.rating, Comment.created_at)
+            .join(User, Comment.user_id == User.id)
+            .order_by(Comment.id)
+        )
+    for row in db.session.execute(query.execution_options(yield_per=chunk_size)):
+        yield row._asdict()
+
+
+# ============= IMPORT =============
+
+class _ImportContext:
+    """Lookup maps loaded once per import instead of once per row."""
+
+    def __init__(self, default_author):
+        self.categories = dict(db.session.execute(db.select(Category.slug, Category.id)).all())
+        self.users = dict(db.session.execute(db.select(User.username, User.id)).all())
+        self.default_user_id = self.users.get(default_author)
+        self.explicit_ids = False
+
+    def user_id(self, username):
+        return self.users.get(username, self.default_user_id)
+
+
+def _import_categories(ctx, chunk):
+    names = set(db.session.scalars(db.select(Category.name)))
+    rows = []
+    for record in chunk:
+        if not record['slug'] or not record['name']:
+            continue
+        if record['slug'] in ctx.categories or record['name'] in names:
+            continue
+        names.add(record['name'])
+        rows.append(record)
+    for row in rows:
+        category = Category(**row)
+        db.session.add(category)
+        db.session.flush()
+        ctx.categories[category.slug] = category.id
+    return len(rows)
+
+
+def _import_recipes(ctx, chunk):
+    now = datetime.utcnow()
+    ids = [r['id'] for r in chunk if r['id']]
+    titles = [r['title'] for r in chunk if not r['id'] and r['title']]
+    existing_ids = set(db.session.scalars(db.select(Recipe.id).where(Recipe.id.in_(ids)))) if ids else set()
+    existing_keys = set(db.session.execute(
+        db.select(Recipe.title, Recipe.category_id).where(Recipe.title.in_(titles))
+    ).all()) if titles else set()
+
+    with_id, without_id = [], []
+    for record in chunk:
+        category_id = ctx.categories.get(record['category'])
+        user_id = ctx.user_id(record['author'])
+        if not record['title'] or not record['content'] or category_id is None or user_id is None:
+            continue
+        values = {
+            'title': record['title'], 'content': record['content'], 'excerpt': make_excerpt(record['content']),
+            'ingredients': record['ingredients'], 'instructions': record['instructions'],
+            'prep_time': record['prep_time'], 'cook_time': record['cook_time'],
+            'servings': record['servings'], 'image': record['image'],
+            'category_id': category_id, 'user_id': user_id,
+            'created_at': record['created_at'] or now, 'updated_at': record['created_at'] or now,
+        }
+        if record['id']:
+            if record['id'] in existing_ids:
+                continue
+            existing_ids.add(record['id'])
+            with_id.append(dict(values, id=record['id']))
+        else:
+            key = (record['title'], category_id)
+            if key in existing_keys:
+                continue
+            existing_keys.add(key)
+            without_id.append(values)
+
+    for rows in (with_id, without_id):
+        if rows:
+            ids = db.session.scalars(db.insert(Recipe).returning(Recipe.id), rows).all()
+            record_changes(db.session, Recipe, ids, INSERT)
+    ctx.explicit_ids = ctx.explicit_ids or bool(with_id)
+    return len(with_id) + len(without_id)
+
+
+def _import_comments(ctx, chunk):
+    now = datetime.utcnow()
+    recipe_ids = {r['recipe_id'] for r in chunk if r['recipe_id']}
+    known_recipes = set(db.session.scalars(db.select(Recipe.id).where(Recipe.id.in_(recipe_ids)))) if recipe_ids else set()
+    ids = [r['id'] for r in chunk if r['id']]
+    existing_ids = set(db.session.scalars(db.select(Comment.id).where(Comment.id.in_(ids)))) if ids else set()
+    # Doğal anahtar yalnızca bu parçadaki (tarif, yazar) çiftleri için okunur;
+    # tarifin diğer kullanıcılardan gelen yorumları her parçada yüklenmez
+    pairs = {(r['recipe_id'], ctx.user_id(r['author'])) for r in chunk
+             if not r['id'] and r['body'] and r['recipe_id'] in known_recipes}
+    pairs = {pair for pair in pairs if pair[1] is not None}
+    existing_keys = set(db.session.execute(
+        db.select(Comment.recipe_id, Comment.user_id, Comment.body)
+        .where(db.tuple_(Comment.recipe_id, Comment.user_id).in_(pairs))
+    ).all()) if pairs else set()
+
+    with_id, without_id = [], []
+    for record in chunk:
+        user_id = ctx.user_id(record['author'])
+        if not record['body'] or record['recipe_id'] not in known_recipes or user_id is None:
+            continue
+        values = {
+            'recipe_id': record['recipe_id'], 'user_id': user_id, 'body': record['body'],
+            'rating': record['rating'], 'created_at': record['created_at'] or now,
+        }
+        if record['id']:
+            if record['id'] in existing_ids:
+                continue
+            existing_ids.add(record['id'])
+            with_id.append(dict(values, id=record['id']))
+        else:
+            key = (record['recipe_id'], user_id, record['body'])
+            if key in existing_keys:
+                continue
+            existing_keys.add(key)
+            without_id.append(values)
+
+    for rows in (with_id, without_id):
+        if rows:
+            ids = db.session.scalars(db.insert(Comment).returning(Comment.id), rows).all()
+            record_changes(db.session, Comment, ids, INSERT)
+    if with_id or without_id:
+        Recipe.refresh_comment_stats({row['recipe_id'] for row in with_id + without_id})
+    ctx.explicit_ids = ctx.explicit_ids or bool(with_id)
+    return len(with_id) + len(without_id)
+
+
+_IMPORTERS = {
+    'categories': (_import_categories, Category),
+    'recipes': (_import_recipes, Recipe),
+    'comments': (_import_comments, Comment),
+}
+
+
+def _sync_sequence(model):
+    """Explicit ids bypass PostgreSQL sequences; move the sequence past them."""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    table = model.__tablename__
+    db.session.execute(db.text(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+    ))
+
+
+def import_records(entity, records, chunk_size=1000, default_author='admin', progress=None):
+    """Insert ``records`` in chunks of ``chunk_size``, committing each chunk.
+
+    Returns a dict with ``read``, ``inserted`` and ``skipped`` counts; the
+    same dict is passed to ``progress`` after every chunk.
+    """
+    importer, model = _IMPORTERS[entity]
+    ctx = _ImportContext(default_author)
+    result = {'read': 0, 'inserted': 0, 'skipped': 0}
+    records = iter(records)
+    while True:
+        chunk = [_coerce(r, FIELDS[entity]) for r in islice(records, chunk_size)]
+        if not chunk:
+            break
+        inserted = importer(ctx, chunk)
+        db.session.commit()
+        result['read'] += len(chunk)
+        result['inserted'] += inserted
+        result['skipped'] += len(chunk) - inserted
+        if progress:
+            progress(result)
+    if ctx.explicit_ids:
+        _sync_sequence(model)
+        db.session.commit()
+    return result
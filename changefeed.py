@@ -0,0 +1,250 @@
+"""Değişiklik akışı (transactional outbox).
+
+İzlenen tablolara yapılan her yazma, yazmanın kendisiyle aynı transaction'da
+``change_events`` tablosuna ``(entity, entity_id, op)`` olarak eklenir; yazma
+geri alınırsa olay da geri alınır. Olayların sırası id'lerinin sırasıdır.
+
+* ORM ile eklenen, değiştirilen ve silinen nesneler: ``after_flush`` olayı.
+* ORM toplu ``UPDATE``/``DELETE`` ifadeleri (``db.update(Recipe).where(...)``):
+  ``do_orm_execute`` olayı, ifade çalışmadan önce aynı WHERE ile.
+* ORM nesnesi kullanmayan toplu eklemeler (bulk.py): ``record_changes``.
+
+Yalnızca türetilmiş kolonları güncelleyen ifadeler (yorum toplamları,
+popülerlik puanı) ``execution_options={'change_feed': False}`` ile akışa
+yazılmaz. Veritabanının ON DELETE CASCADE ile sildiği alt kayıtlar için olay
+yoktur; bir tarifin ``delete`` olayı yorumlarının da gittiği anlamına gelir.
+
+Türetilmiş yapılar (arama indeksi, önbellekler, site haritası) akışı
+``ChangeConsumer`` ile kaldıkları yerden okuyup değişiklikleri toplu uygular.
+Eski olaylar ``prune`` ile silinir (her kaydın son olayı kalır).
+"""
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from models import db, ChangeEvent, ChangeFeedOffset, Recipe, Comment, Category, Page, Image, User
+
+INSERT, UPDATE, DELETE = 'insert', 'update', 'delete'
+TRACKED = frozenset(model.__tablename__ for model in (Recipe, Comment, Category, Page, Image, User))
+
+# change_feed_offsets'te prune edilen son olayın id'sini tutan satır; tüketici değil
+PRUNED_MARK = '~pruned'
+DEFAULT_RETENTION = timedelta(days=3)
+
+Change = namedtuple('Change', 'id entity entity_id op created_at')
+
+_events = ChangeEvent.__table__
+
+
+def _insert_events(connection, rows):
+    stmt = db.insert(_events).values(
+        entity=db.bindparam('e_entity'), entity_id=db.bindparam('e_id'), op=db.bindparam('e_op'),
+        created_at=db.bindparam('e_at'),
+    )
+    connection.execute(stmt, rows)
+
+
+def record_changes(session, model, ids, op):
+    """Append ``op`` events for ``ids`` of ``model`` in the session's transaction."""
+    now = datetime.utcnow()
+    rows = [{'e_entity': model.__tablename__, 'e_id': entity_id, 'e_op': op, 'e_at': now} for entity_id in ids]
+    if rows:
+        _insert_events(_primary_connection(session), rows)
+
+
+def _primary_connection(session):
+    # Olay, yazmayla aynı (birincil) veritabanına gitmeli; clause'suz connection()
+    # bir GET isteğinde okuma kopyasını seçebilir (bkz. db_routing.py)
+    return session.connection(bind_arguments={'clause': db.insert(_events)})
+
+
+# ----- oturum olayları -----
+
+def _after_flush(session, flush_context):
+    # after_flush'ta new/dirty/deleted ve öznitelik geçmişi henüz sıfırlanmamıştır
+    now = datetime.utcnow()
+    rows = []
+    for objects, op in ((session.new, INSERT), (session.dirty, UPDATE), (session.deleted, DELETE)):
+        for obj in objects:
+            entity = getattr(obj, '__tablename__', None)
+            if entity not in TRACKED:
+                continue
+            if op == UPDATE and not session.is_modified(obj, include_collections=False):
+                continue
+            rows.append({'e_entity': entity, 'e_id': obj.id, 'e_op': op, 'e_at': now})
+    if rows:
+        _insert_events(_primary_connection(session), rows)
+
+
+def _before_bulk_dml(state):
+    if not (state.is_update or state.is_delete) or not state.is_orm_statement:
+        return
+    if not state.execution_options.get('change_feed', True):
+        return
+    mapper = state.bind_mapper
+    table = mapper.local_table if mapper is not None else None
+    if table is None or table.name not in TRACKED:
+        return
+    op = UPDATE if state.is_update else DELETE
+    rows = db.select(db.literal(table.name), table.c.id, db.literal(op), db.literal(datetime.utcnow(), db.DateTime))
+    if state.statement.whereclause is not None:
+        rows = rows.where(state.statement.whereclause)
+    # İfadenin kendisiyle yönlendirilir: DML olduğu için birincile gider ve isteği
+    # yazmış olarak işaretler; ardından çalışan UPDATE/DELETE de aynı bağlantıyı kullanır
+    state.session.connection(bind_arguments={'clause': state.statement}).execute(
+        db.insert(_events).from_select(['entity', 'entity_id', 'op', 'created_at'], rows)
+    )
+
+
+def init_change_feed(session):
+    """Record changes made through ``session`` (a Session class, sessionmaker or scoped_session)."""
+    event.listen(session, 'after_flush', _after_flush)
+    event.listen(session, 'do_orm_execute', _before_bulk_dml)
+
+
+# ----- okuma -----
+
+def head():
+    """Id of the newest event, 0 for an empty feed."""
+    return db.session.scalar(db.select(db.func.max(ChangeEvent.id))) or 0
+
+
+def latest_changes(changes):
+    """Collapse ``changes`` to the last one per record: ``{(entity, entity_id): Change}``."""
+    return {(change.entity, change.entity_id): change for change in changes}
+
+
+class ChangeConsumer:
+    """Reads the feed in id order, ``batch_size`` events at a time.
+
+    With a ``name`` the position is kept in ``change_feed_offsets`` and saved in
+    the same transaction as whatever the handler wrote, so a restarted
+    processor resumes where it stopped. Without one it lives in memory.
+    ``entities`` limits the events handed out; skipped ones still advance
+    the position.
+
+    Ids become visible as transactions commit, not in the order they were
+    handed out, so a missing id may belong to a transaction still in flight.
+    The consumer stops in front of such a gap and only moves past it once it
+    has seen the gap for ``gap_grace`` seconds; ids up to the last prune are
+    never waited for.
+    """
+
+    def __init__(self, name=None, entities=None, batch_size=500, gap_grace=30.0):
+        self.name = name
+        self.entities = frozenset(entities) if entities else None
+        self.batch_size = batch_size
+        self.gap_grace = gap_grace
+        self._position = None
+        self._gaps = {}  # boşluktan sonraki ilk görünen id -> boşluğun ilk görüldüğü an
+
+    @property
+    def position(self):
+        if self._position is None:
+            stored = db.session.get(ChangeFeedOffset, self.name) if self.name else None
+            self._position = stored.position if stored else 0
+        return self._position
+
+    def seek(self, position):
+        """Move the in-memory position; saved with the next ``commit``."""
+        self._position = position
+
+    def fetch(self, limit=None):
+        """Return ``(changes, position)`` for the next batch after the current position."""
+        position = self.position
+        rows = db.session.execute(
+            db.select(ChangeEvent.id, ChangeEvent.entity, ChangeEvent.entity_id, ChangeEvent.op,
+                      ChangeEvent.created_at)
+            .where(ChangeEvent.id > position)
+            .order_by(ChangeEvent.id)
+            .limit(limit or self.batch_size)
+        ).all()
+        changes, pruned = [], None
+        for row in rows:
+            if row.id != position + 1:
+                if pruned is None:
+                    pruned = pruned_position()
+                if row.id - 1 > pruned and not self._gap_expired(row.id):
+                    break
+            position = row.id
+            if self.entities is None or row.entity in self.entities:
+                changes.append(Change(*row))
+        self._gaps = {end: seen for end, seen in self._gaps.items() if end > position}
+        return changes, position
+
+    def _gap_expired(self, end):
+        # Daha önce daha ileride biten bir boşluk görüldüyse bu boşluk o zamandan beri var
+        now = time.monotonic()
+        seen = min((seen for gap_end, seen in self._gaps.items() if gap_end >= end), default=None)
+        if seen is None:
+            self._gaps[end] = seen = now
+        return now - seen >= self.gap_grace
+
+    def commit(self, position):
+        self._position = position
+        if self.name:
+            offset = db.session.get(ChangeFeedOffset, self.name) or ChangeFeedOffset(consumer=self.name)
+            offset.position = position
+            db.session.add(offset)
+        db.session.commit()
+
+    def process(self, handler):
+        """Pass the next batch to ``handler(changes)`` and commit its writes with
+        the new position. Returns ``(handled, advanced)``; a failing handler
+        rolls back and leaves the position where it was.
+        """
+        start = self.position
+        changes, position = self.fetch()
+        if position == start:
+            return 0, False
+        try:
+            if changes:
+                handler(changes)
+            self.commit(position)
+        except Exception:
+            db.session.rollback()
+            self._position = start
+            raise
+        return len(changes), True
+
+    def run(self, handler, max_batches=None):
+        """Process batches until the feed is drained; returns the number of changes handled."""
+        handled = batches = 0
+        while max_batches is None or batches < max_batches:
+            count, advanced = self.process(handler)
+            if not advanced:
+                break
+            handled += count
+            batches += 1
+        return handled
+
+
+def pruned_position():
+    """Id of the last pruned event; gaps at or below it are final."""
+    mark = db.session.get(ChangeFeedOffset, PRUNED_MARK)
+    return mark.position if mark else 0
+
+
+def prune(before=None, retention=DEFAULT_RETENTION):
+    """Delete events up to id ``before`` (default: those older than
+    ``retention``), keeping each record's latest event so a consumer that
+    falls behind, or a new one reading from 0, still sees every record's
+    final state once. Returns the number of events deleted.
+    """
+    if before is None:
+        cutoff = datetime.utcnow() - retention
+        before = db.session.scalar(db.select(db.func.max(ChangeEvent.id)).where(ChangeEvent.created_at < cutoff))
+        if before is None:
+            return 0
+    latest = db.select(db.func.max(ChangeEvent.id)).group_by(ChangeEvent.entity, ChangeEvent.entity_id)
+    deleted = db.session.execute(
+        db.delete(ChangeEvent).where(ChangeEvent.id <= before, ChangeEvent.id.not_in(latest)),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+    mark = db.session.get(ChangeFeedOffset, PRUNED_MARK) or ChangeFeedOffset(consumer=PRUNED_MARK, position=0)
+    mark.position = max(mark.position, before)
+    db.session.add(mark)
+    db.session.commit()
+    return deleted
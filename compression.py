@@ -0,0 +1,312 @@
+"""Yanıt sıkıştırma (gzip, kuruluysa brotli) WSGI ara katmanı.
+
+* Kodlama ``Accept-Encoding`` başlığındaki q değerlerine göre seçilir; eşitlikte
+  brotli önce gelir. ``brotli`` paketi isteğe bağlıdır, yoksa yalnızca gzip.
+* Yalnızca metin türleri (HTML, CSS, JS, JSON, XML, SVG) ve ``min_size``
+  bayttan büyük gövdeler sıkıştırılır; ``Content-Encoding`` taşıyan,
+  ``Cache-Control: no-transform`` diyen, 204/206/304 ve HEAD yanıtlarına
+  dokunulmaz. Sıkıştırılabilir her yanıta ``Vary: Accept-Encoding`` eklenir.
+* Akan (``Content-Length`` olmayan) yanıtlar parça parça sıkıştırılır:
+  ``flush_size`` bayt birikince ``Z_SYNC_FLUSH`` ile istemciye gönderilir,
+  bellek sabit kalır. ``min_size``'a ulaşmadan biten akış sıkıştırılmaz.
+* Sıkıştırılmış gövdeler ``CompressedCache``'te tutulur ve bir daha
+  sıkıştırılmaz. ``ETag`` taşıyan yanıtlar adres + ETag ile aranır; bulunursa
+  uygulamanın gövdesi hiç okunmaz (site haritası gibi önbellekli yanıtlar).
+  ETag'siz tam gövdeler içeriklerinin özetiyle aranır: aynı HTML'i üreten
+  anonim sayfalar yeniden sıkıştırılmaz.
+"""
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from itertools import chain
+
+try:
+    import brotli
+except ImportError:  # isteğe bağlı: pip install Brotli
+    brotli = None
+
+GZIP, BROTLI = 'gzip', 'br'
+COMPRESSIBLE_TYPES = frozenset({
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript', 'text/csv',
+    'application/javascript', 'application/json', 'application/xml', 'application/rss+xml',
+    'application/atom+xml', 'application/manifest+json', 'image/svg+xml',
+})
+UNCOMPRESSED_STATUSES = frozenset({204, 206, 304})
+
+
+def available_encodings():
+    """Encodings this process can produce, in order of preference."""
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def negotiate(accept_encoding, encodings):
+    """Pick the best of ``encodings`` for an ``Accept-Encoding`` header, or None."""
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class StreamCompressor:
+    """Incremental compressor; ``compress`` returns whatever is ready to send."""
+
+    def __init__(self, encoding, level, flush_size=0):
+        self.flush_size = flush_size
+        self._pending = 0
+        if encoding == BROTLI:
+            self._brotli = brotli.Compressor(quality=level)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip başlığı
+
+    def compress(self, data):
+        self._pending += len(data)
+        flush = self._pending >= self.flush_size
+        if flush:
+            self._pending = 0
+        if self._brotli is not None:
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self):
+        return self._brotli.finish() if self._brotli is not None else self._zlib.flush()
+
+
+def compress(data, encoding, level):
+    compressor = StreamCompressor(encoding, level)
+    return compressor.compress(data) + compressor.finish()
+
+
+class CompressedCache:
+    """Bounded per-process LRU of compressed bodies, limited by total bytes."""
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, max_item_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes if max_item_bytes is not None else max_bytes // 8
+        self._data = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._data.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key, body):
+        if len(body) > self.max_item_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._data[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def snapshot(self):
+        with self._lock:
+            return {'entries': len(self._data), 'bytes': self._size, 'hits': self.hits, 'misses': self.misses}
+
+
+def _header(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _with_vary(headers):
+    vary = _header(headers, 'Vary')
+    if vary is None:
+        return headers + [('Vary', 'Accept-Encoding')]
+    if 'accept-encoding' in vary.lower() or vary.strip() == '*':
+        return headers
+    return [(k, f'{v}, Accept-Encoding' if k.lower() == 'vary' else v) for k, v in headers]
+
+
+def _compressed_headers(headers, encoding, length=None):
+    dropped = ('content-length', 'content-encoding', 'etag')
+    result = [(k, v) for k, v in headers if k.lower() not in dropped]
+    etag = _header(headers, 'ETag')
+    if etag:
+        # Sıkıştırılmış gövde bayt bayt aynı değil: zayıf ETag. If-None-Match zayıf
+        # karşılaştırdığı için 304 yanıtları çalışmaya devam eder
+        result.append(('ETag', etag if etag.startswith('W/') else 'W/' + etag))
+    result.append(('Content-Encoding', encoding))
+    if length is not None:
+        result.append(('Content-Length', str(length)))
+    return _with_vary(result)
+
+
+def _close(app_iter):
+    close = getattr(app_iter, 'close', None)
+    if close is not None:
+        close()
+
+
+class CompressionMiddleware:
+    """Compress responses of the wrapped WSGI application.
+
+    The application must call ``start_response`` before returning its body
+    iterable, as Flask does; otherwise the response is passed through.
+    """
+
+    def __init__(self, app, min_size=1024, level=6, brotli_quality=4, flush_size=8 * 1024,
+                 cache_bytes=16 * 1024 * 1024, encodings=None):
+        self.app = app
+        self.min_size = min_size
+        self.levels = {GZIP: level, BROTLI: brotli_quality}
+        self.flush_size = flush_size
+        self.encodings = tuple(encodings or available_encodings())
+        self.cache = CompressedCache(cache_bytes)
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.app(environ, start_response)
+        encoding = negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''), self.encodings)
+
+        captured = []
+        written = []
+
+        def capture(status, headers, exc_info=None):
+            if captured == [None]:  # geç çağrıldı: olduğu gibi ilet
+                return start_response(status, headers, exc_info)
+            captured[:] = [(status, headers, exc_info)]
+            return written.append
+
+        app_iter = self.app(environ, capture)
+        if not captured:
+            captured.append(None)
+            return app_iter
+        status, headers, exc_info = captured[0]
+        body = chain(written, app_iter) if written else app_iter
+
+        if not self._compressible(status, headers):
+            start_response(status, headers, exc_info)
+            return app_iter if not written else self._passthrough(body, app_iter)
+        length = _header(headers, 'Content-Length')
+        if length is not None and int(length) < self.min_size:
+            start_response(status, _with_vary(headers), exc_info)
+            return app_iter if not written else self._passthrough(body, app_iter)
+        if encoding is None:
+            start_response(status, _with_vary(headers), exc_info)
+            return app_iter if not written else self._passthrough(body, app_iter)
+
+        level = self.levels[encoding]
+        etag = _header(headers, 'ETag')
+        etag_key = (encoding, environ.get('HTTP_HOST'), environ.get('SCRIPT_NAME', '') + environ.get('PATH_INFO', ''),
+                    environ.get('QUERY_STRING', ''), etag) if etag else None
+        if etag_key is not None:
+            cached = self.cache.get(etag_key)
+            if cached is not None:
+                _close(app_iter)  # gövde hiç üretilmez
+                start_response(status, _compressed_headers(headers, encoding, len(cached)), exc_info)
+                return [cached]
+
+        if length is not None and int(length) <= self.cache.max_item_bytes:
+            try:
+                data = b''.join(body)
+            finally:
+                _close(app_iter)
+            key = etag_key or (encoding, hashlib.blake2b(data, digest_size=16).digest())
+            compressed = self.cache.get(key) if etag_key is None else None
+            if compressed is None:
+                compressed = compress(data, encoding, level)
+                self.cache.set(key, compressed)
+            start_response(status, _compressed_headers(headers, encoding, len(compressed)), exc_info)
+            return [compressed]
+
+        return self._stream(body, app_iter, status, headers, exc_info, start_response, encoding, level, etag_key)
+
+    def _compressible(self, status, headers):
+        code = int(status.split(None, 1)[0])
+        if code < 200 or code in UNCOMPRESSED_STATUSES:
+            return False
+        if _header(headers, 'Content-Encoding') or _header(headers, 'X-Accel-Redirect') or _header(headers, 'X-Sendfile'):
+            return False
+        mimetype = (_header(headers, 'Content-Type') or '').split(';', 1)[0].strip().lower()
+        if mimetype not in COMPRESSIBLE_TYPES:
+            return False
+        return 'no-transform' not in (_header(headers, 'Cache-Control') or '').lower()
+
+    @staticmethod
+    def _passthrough(body, app_iter):
+        try:
+            yield from body
+        finally:
+            _close(app_iter)
+
+    def _stream(self, body, app_iter, status, headers, exc_info, start_response, encoding, level, etag_key):
+        # Başlıklar ilk bayttan önce gönderilmeli; min_size'a kadar beklenir
+        try:
+            head, size = [], 0
+            for chunk in body:
+                if chunk:
+                    head.append(chunk)
+                    size += len(chunk)
+                    if size >= self.min_size:
+                        break
+            else:
+                data = b''.join(head)
+                headers = [(k, v) for k, v in headers if k.lower() != 'content-length']
+                start_response(status, _with_vary(headers + [('Content-Length', str(len(data)))]), exc_info)
+                yield data
+                return
+
+            start_response(status, _compressed_headers(headers, encoding), exc_info)
+            compressor = StreamCompressor(encoding, level, self.flush_size)
+            # ETag'li akış yanıtı sığıyorsa önbelleğe alınır
+            kept, kept_size = ([] if etag_key is not None else None), 0
+            for chunk in chain(head, body):
+                if not chunk:
+                    continue
+                out = compressor.compress(chunk)
+                if out:
+                    if kept is not None:
+                        kept.append(out)
+                        kept_size += len(out)
+                        if kept_size > self.cache.max_item_bytes:
+                            kept = None
+                    yield out
+            out = compressor.finish()
+            if kept is not None and kept_size + len(out) <= self.cache.max_item_bytes:
+                kept.append(out)
+                self.cache.set(etag_key, b''.join(kept))
+            yield out
+        finally:
+            _close(app_iter)
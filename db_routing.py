@@ -0,0 +1,64 @@
+"""Okuma kopyası (read replica) yönlendirmesi.
+
+GET/HEAD isteklerindeki SELECT'ler ``DATABASE_REPLICA_KEYS`` içindeki
+bağlantılardan birine gider. Şu durumlarda her zaman birincil veritabanı
+kullanılır:
+
+* istek bağlamı dışında (CLI, başlangıç, arka plan işleri),
+* GET/HEAD olmayan isteklerde,
+* aynı istekte bir yazma (flush / INSERT / UPDATE / DELETE) olduktan sonra,
+* kullanıcı kısa süre önce yazdıysa (``db_primary_until`` oturum damgası),
+  böylece kendi yorumunu / düzenlemesini hemen görür.
+"""
+import random
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+
+SAFE_METHODS = ('GET', 'HEAD')
+STICKY_SESSION_KEY = 'db_primary_until'
+
+
+def force_primary():
+    """Route the rest of the current request to the primary database."""
+    if has_request_context():
+        g.db_wrote = True
+
+
+class RoutingSession(Session):
+
+    def _is_write(self, clause):
+        return self._flushing or (clause is not None and getattr(clause, 'is_dml', False))
+
+    def _replica_key(self, clause):
+        if not has_request_context():
+            return None
+        if g.get('db_wrote'):
+            return None
+        if self._is_write(clause):
+            g.db_wrote = True
+            return None
+        keys = current_app.config.get('DATABASE_REPLICA_KEYS')
+        if not keys or request.method not in SAFE_METHODS:
+            return None
+        if session.get(STICKY_SESSION_KEY, 0) > time.time():
+            return None
+        if 'db_replica' not in g:
+            g.db_replica = random.choice(keys)
+        return g.db_replica
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            key = self._replica_key(clause)
+            if key is not None:
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def mark_primary_sticky(response):
+    """after_request hook: pin a writer to the primary for a short window."""
+    if current_app.config.get('DATABASE_REPLICA_KEYS') and (
+            request.method not in SAFE_METHODS or g.get('db_wrote')):
+        session[STICKY_SESSION_KEY] = time.time() + current_app.config['DATABASE_STICKY_SECONDS']
+    return response
@@ -0,0 +1,80 @@
+"""Jinja ``{% cache %}`` etiketi - şablon parçalarını bellek içinde önbelleğe alır.
+
+Kullanım::
+
+    {% cache 'index-card', recipe.id, recipe.updated_at, stats.version %}
+        ... kart HTML'i ...
+    {% endcache %}
+
+Anahtar, verilen ifadelerin tamamından oluşur; içerik değiştiğinde anahtarın
+da değişmesi (ör. ``updated_at``) yeterlidir, eski kayıtlar LRU ile düşer.
+Önbellek işçi başınadır: ``clear()`` yalnızca çağıran işçiyi temizler. Parçada
+gösterilen her değer (başka bir kaydın adı dahil) anahtarda olmalıdır.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+
+class FragmentCache:
+    """Bounded per-process LRU store of rendered fragments with a TTL."""
+
+    def __init__(self, maxsize=5000, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FragmentCacheExtension(Extension):
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=FragmentCache())
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key_parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            key_parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render_cached', [nodes.List(key_parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_cached(self, key_parts, caller):
+        cache = self.environment.fragment_cache
+        key = tuple(key_parts)
+        rendered = cache.get(key)
+        if rendered is None:
+            rendered = caller()
+            cache.set(key, rendered)
+        return rendered
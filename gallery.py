@@ -0,0 +1,150 @@
+"""Tarif galerisi için çoklu fotoğraf yükleme.
+
+Yüklenen dosyalar sınırlı bir iş parçacığı havuzunda paralel işlenir: her
+dosyanın başlığı okunup gerçek biçimi (PNG/JPEG/GIF/WebP) ve boyutları
+çözülür, uzantısı biçime göre düzeltilir ve asla üzerine yazılmayan bir adla
+diske kaydedilir. İstek, tüm orijinaller diske yazılınca döner.
+"""
+import os
+import struct
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from werkzeug.utils import secure_filename
+
+StoredImage = namedtuple('StoredImage', 'filename format width height')
+
+EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'gif': 'gif', 'webp': 'webp'}
+# JPEG SOF işaretçileri (DHT/JPG/DAC hariç); boyut bilgisi bunlarda bulunur
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+class UploadRejected(ValueError):
+    """Raised for a file that is not a usable image; message is user-facing."""
+
+    def __init__(self, name, reason):
+        super().__init__(f'{name}: {reason}')
+        self.name = name
+        self.reason = reason
+
+
+def _jpeg_size(data):
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # dolgu baytı
+            i += 1
+            continue
+        if marker in _JPEG_SOF:
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+    return None
+
+
+def _webp_size(data):
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30:
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25:
+        b0, b1, b2, b3 = data[21:25]
+        return 1 + (b0 | (b1 & 0x3F) << 8), 1 + (b1 >> 6 | b2 << 2 | (b3 & 0x0F) << 10)
+    if chunk == b'VP8X' and len(data) >= 30:
+        return 1 + int.from_bytes(data[24:27], 'little'), 1 + int.from_bytes(data[27:30], 'little')
+    return None
+
+
+def sniff_image(data):
+    """Return ``(format, width, height)`` decoded from the header, or None."""
+    size = None
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and data[12:16] == b'IHDR':
+        fmt, size = 'png', struct.unpack('>II', data[16:24])
+    elif data[:3] == b'\xff\xd8\xff':
+        fmt, size = 'jpeg', _jpeg_size(data)
+    elif data[:6] in (b'GIF87a', b'GIF89a'):
+        fmt, size = 'gif', struct.unpack('<HH', data[6:10])
+    elif data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        fmt, size = 'webp', _webp_size(data)
+    if not size or not all(size):
+        return None
+    return (fmt,) + tuple(size)
+
+
+class UploadProcessor:
+    """Validates and stores uploads on a bounded, per-process thread pool."""
+
+    def __init__(self, folder, max_workers=4, max_pixels=50_000_000):
+        self.folder = folder
+        self.max_workers = max_workers
+        self.max_pixels = max_pixels
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        # Havuz ilk kullanımda kurulur; fork edilen işçi ebeveynin havuzunu kullanamaz
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='upload')
+                self._pid = os.getpid()
+            return self._executor
+
+    def _store(self, file, prefix):
+        name = file.filename
+        data = file.read()
+        sniffed = sniff_image(data)
+        if sniffed is None:
+            raise UploadRejected(name, 'desteklenmeyen veya bozuk görsel')
+        fmt, width, height = sniffed
+        if width * height > self.max_pixels:
+            raise UploadRejected(name, f'görsel çok büyük ({width}x{height})')
+        stem = os.path.splitext(secure_filename(name))[0] or 'image'
+        filename = f'{prefix}_{stem}.{EXTENSIONS[fmt]}'
+        path = os.path.join(self.folder, filename)
+        out = open(path, 'xb')  # FileExistsError: dosya başkasının, silinmez
+        try:
+            with out:
+                out.write(data)
+        except OSError:
+            os.remove(path)  # yarım yazılmış dosya
+            raise
+        return StoredImage(filename, fmt, width, height)
+
+    def remove(self, stored):
+        for image in stored:
+            try:
+                os.remove(os.path.join(self.folder, image.filename))
+            except OSError:
+                pass  # kalırsa sahipsiz dosya taraması temizler
+
+    def store_all(self, files):
+        """Store ``files`` concurrently; returns StoredImage or UploadRejected per file, in order.
+        If any file cannot be written (disk full, permissions, name taken) the
+        files already written are removed and the first OSError is raised.
+        """
+        files = [f for f in files if f and f.filename]
+        if not files:
+            return []
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        executor = self.executor()
+        futures = [executor.submit(self._store, f, f'{timestamp}_{i}') for i, f in enumerate(files)]
+        results, errors = [], []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except UploadRejected as rejected:
+                results.append(rejected)
+            except OSError as error:
+                errors.append(error)
+        if errors:
+            self.remove([result for result in results if isinstance(result, StoredImage)])
+            raise errors[0]
+        return results
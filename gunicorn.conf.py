@@ -0,0 +1,181 @@
+"""Production gunicorn ayarları.
+
+Gunicorn bu dosyayı çalışma dizininde kendiliğinden bulur; Render'daki başlatma
+komutu yine de açıkça verir::
+
+    gunicorn -c gunicorn.conf.py app:app
+
+* İşçi sayısı CPU kotasına ve bellek sınırına (cgroup) göre hesaplanır: CPU
+  başına bir işçi, belleğe sığdığı kadar. ``WEB_CONCURRENCY`` verilirse o
+  kullanılır.
+* ``preload_app``: uygulama (importlar, derlenmiş şablonlar) ana süreçte bir
+  kez yüklenir, işçiler copy-on-write ile paylaşır.
+* Isınma (``WARM_UP_ON_START``) import'ta değil burada yapılır: preload ile
+  ana süreçte işçiler fork edilmeden önce (``when_ready``), preload kapalıysa
+  her işçide istek kabul etmeden önce (``post_worker_init``). Böylece
+  ``flask`` komutları ve testler uygulamayı import ederken ısınma çalışmaz.
+* Fork sonrası devralınan veritabanı bağlantıları işçide atılır; log
+  dinleyicisi, görüntülenme sayacı ve yükleme havuzu zaten süreç kimliğine
+  (pid) bakarak kendilerini yeniden kurar.
+* İşçiler ``max_requests`` (+ rastgele sapma) istekten sonra yenilenir, hepsi
+  aynı anda yeniden başlamaz.
+* İşçi tipi ``GUNICORN_WORKER_CLASS`` ile seçilir. Varsayılan ``sync``: yerel
+  ölçümde en hızlısıydı ve yenilenirken bağlantı düşürmez. Dış görsel
+  çözümleme (~11 s) sık ise ``WEB_CONCURRENCY=2`` bekleyen isteğin yanında
+  ikinci bir işçi bırakır (ölçümde verimin ~%10'u ve ~75 MB karşılığında).
+  ``gthread`` aynı işi iş parçacığıyla yapar; ancak gunicorn'un gthread işçisi
+  ``max_requests`` ile yenilenirken kabul edip henüz işlemediği bağlantıları
+  kapatır. ``gevent`` için ``gevent`` (PostgreSQL için ayrıca ``psycogreen``)
+  kurulmalıdır.
+"""
+import math
+import os
+
+MB = 1024 * 1024
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit():
+    """CPUs available to this container: cgroup quota if set, else the affinity mask."""
+    quota = None
+    cpu_max = _read('/sys/fs/cgroup/cpu.max')  # cgroup v2: "<quota> <period>"
+    if cpu_max and not cpu_max.startswith('max'):
+        limit, period = cpu_max.split()
+        quota = int(limit) / int(period)
+    else:
+        limit, period = _read('/sys/fs/cgroup/cpu/cpu.cfs_quota_us'), _read('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+        if limit and period and int(limit) > 0:
+            quota = int(limit) / int(period)
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(cpus, 1)
+
+
+def memory_limit_mb():
+    """Memory limit in MB: GUNICORN_MEMORY_MB, the cgroup limit, or physical memory."""
+    if os.getenv('GUNICORN_MEMORY_MB'):
+        return int(os.getenv('GUNICORN_MEMORY_MB'))
+    physical = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // MB
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        value = _read(path)
+        if value and value.isdigit():
+            return min(int(value) // MB, physical)  # sınırsız cgroup çok büyük bir sayı döner
+    return physical
+
+
+def default_workers(cpus, memory_mb):
+    # CPU başına bir işçi; bellek yetmiyorsa sığan kadar. Sayfalar CPU'ya bağlı:
+    # tek çekirdekte 2 * CPU + 1 (3 sync işçi) verimi düşürüp belleği ikiye
+    # katladı (bkz. RENDER_DEPLOY.md, bench_server.py)
+    by_cpu = cpus
+    usable = memory_mb * 0.9 - MASTER_MEMORY_MB
+    by_memory = int(usable // WORKER_MEMORY_MB)
+    return max(1, min(by_cpu, by_memory))
+
+
+# Bir işçinin preload sonrası kendine ait (paylaşılmayan) belleği ve ana süreç
+# için tahmin; yerel ölçümde her ek işçi ~75 MB PSS (bkz. bench_server.py)
+WORKER_MEMORY_MB = int(os.getenv('GUNICORN_WORKER_MEMORY_MB', 80))
+MASTER_MEMORY_MB = int(os.getenv('GUNICORN_MASTER_MEMORY_MB', 70))
+
+bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+workers = int(os.getenv('WEB_CONCURRENCY') or default_workers(cpu_limit(), memory_limit_mb()))
+threads = int(os.getenv('GUNICORN_THREADS', 4)) if worker_class == 'gthread' else 1
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 100))  # gevent
+
+# İşçi yenileme: bellek sızıntılarına ve parçalanmaya karşı; sapma, tüm işçilerin
+# aynı anda yeniden başlamasını önler
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+
+# Dış görsel çözümleme HEAD (5 s) + GET (6 s) sürebilir; sync işçide tüm istek
+# ``timeout`` içinde bitmelidir, gthread/gevent'te bu yalnızca işçinin canlılık süresidir
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 20))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Render loglarında istek satırları uygulamanın JSON loglarından gelir
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+# /dev/shm: işçi kalp atışı dosyası diskte yavaş olabilir
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+if worker_class == 'gevent':
+    # preload_app ile uygulama ana süreçte import edilir; yamalar ondan önce yapılmalı
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        pass
+
+
+def _dispose_engines(close):
+    from app import app, db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
+
+
+def _prune_change_feed(server):
+    # Açılışta (deploy, uyuyan instance'ın uyanması) eski akış olayları silinir;
+    # çalışan instance'ta budama jobs.py ile periyodik olarak sürer
+    from app import app, prune_change_feed
+    try:
+        with app.app_context():
+            deleted = prune_change_feed()
+        server.log.info('Change feed: %s old event(s) pruned', deleted)
+    except Exception:
+        server.log.exception('Change feed pruning failed')
+
+
+def _warm_up(log):
+    from app import app, warm_up
+    if app.config['WARM_UP_ON_START']:
+        log.info('Warm-up done in %d ms', round(warm_up() * 1000))
+
+
+def when_ready(server):
+    server.log.info('Workers: %s x %s (%s), cpus=%s, memory=%s MB', server.cfg.workers,
+                    server.cfg.threads, server.cfg.worker_class_str, cpu_limit(), memory_limit_mb())
+    if server.cfg.preload_app:
+        # Uygulama zaten ana süreçte yüklü. İşçiler ısınmış şablonları ve derlenmiş
+        # sorguları fork ile devralır; ana süreç budama ve ısınmada açtığı
+        # bağlantıları fork etmeden önce kapatır. Preload kapalıyken ana süreç
+        # uygulamayı hiç import etmez (budamayı işçilerdeki periyodik iş yapar)
+        _prune_change_feed(server)
+        _warm_up(server.log)
+        _dispose_engines(close=True)
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        # Preload yoksa her işçi uygulamayı kendisi yükler; istek kabul etmeden önce ısınır
+        _warm_up(worker.log)
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        # Yeniden başlatılan işçiler için de: devralınan soketler işçide kullanılmaz,
+        # ebeveynin bağlantılarını kapatmamak için close=False
+        _dispose_engines(close=False)
+
+
+def worker_exit(server, worker):
+    # max_requests ile yenilenen işçi tamponundaki görüntülenmeleri ve logları kaybetmesin
+    from app import app, view_counter
+    with app.app_context():
+        view_counter.flush()
+    app.extensions['log_handler'].stop_listener()
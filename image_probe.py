@@ -0,0 +1,94 @@
+"""Bir web sayfasından kapak görseli adresini akış halinde bulma.
+
+Sayfa gövdesi parça parça okunur ve ``html.parser`` ile artımlı taranır:
+``og:image`` bulunduğu anda okuma biter. ``twitter:image`` ya da ilk ``<img>``
+ise ``<head>`` kapandığında (``og:image`` artık gelmeyecekken) yeterlidir.
+Toplam okunan bayt ve süre sınırlıdır; sınıra gelindiğinde o ana kadar
+bulunan en iyi aday döner. ``<script>``/``<style>`` içerikleri etiket
+sayılmaz, böylece JavaScript metnindeki ``<img`` yanlış eşleşmez.
+"""
+import codecs
+import re
+import time
+from html.parser import HTMLParser
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+OG_IMAGE_KEYS = ('og:image', 'og:image:url', 'og:image:secure_url')
+TWITTER_IMAGE_KEYS = ('twitter:image', 'twitter:image:src')
+
+_CHARSET = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+
+
+def is_html(content_type):
+    return content_type.split(';', 1)[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+def charset_of(content_type, default='utf-8'):
+    """Charset named in a Content-Type header, if Python knows it."""
+    match = _CHARSET.search(content_type or '')
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return default
+
+
+class ImageTagScanner(HTMLParser):
+    """Incremental scanner collecting og:image, twitter:image and the first <img>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.og_image = None
+        self.twitter_image = None
+        self.first_img = None
+        self.head_closed = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'meta':
+            attrs = dict(attrs)
+            key = (attrs.get('property') or attrs.get('name') or '').strip().lower()
+            content = (attrs.get('content') or '').strip()
+            if not content:
+                return
+            if key in OG_IMAGE_KEYS and self.og_image is None:
+                self.og_image = content
+            elif key in TWITTER_IMAGE_KEYS and self.twitter_image is None:
+                self.twitter_image = content
+        elif tag == 'img' and self.first_img is None:
+            src = (dict(attrs).get('src') or '').strip()
+            if src and not src.startswith('data:'):  # tembel yükleme yer tutucuları
+                self.first_img = src
+        elif tag == 'body':
+            self.head_closed = True
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.head_closed = True
+
+    @property
+    def done(self):
+        if self.og_image:
+            return True
+        return self.head_closed and bool(self.twitter_image or self.first_img)
+
+    @property
+    def result(self):
+        return self.og_image or self.twitter_image or self.first_img
+
+
+def find_page_image(chunks, max_bytes=512 * 1024, encoding='utf-8', deadline=None):
+    """Scan byte ``chunks`` of an HTML body until an image URL is certain,
+    ``max_bytes`` have been read or ``time.monotonic()`` passes ``deadline``.
+    Returns ``(url or None, bytes_read)``; the URL may be relative.
+    """
+    scanner = ImageTagScanner()
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    read = 0
+    for chunk in chunks:
+        chunk = chunk[:max_bytes - read]
+        read += len(chunk)
+        scanner.feed(decoder.decode(chunk))
+        if scanner.done or read >= max_bytes or (deadline is not None and time.monotonic() >= deadline):
+            break
+    return scanner.result, read
@@ -0,0 +1,94 @@
+"""Periyodik bakım işleri, tüm işçiler ve instance'lar arasında aralık başına bir kez.
+
+Her işçi süreci ilk istekte bir arka plan iş parçacığı başlatır. İş parçacığı
+``tick`` saniyede bir kayıtlı işlere bakar; zamanı gelen bir işi çalıştırmadan
+önce ``job_runs`` tablosundaki satırını koşullu bir UPDATE ile sahiplenir::
+
+    UPDATE job_runs SET last_run_at = :now
+    WHERE name = :name AND (last_run_at IS NULL OR last_run_at <= :now - interval)
+
+UPDATE satırı atomik olarak değiştirdiği için aynı anda bakan işçilerden
+yalnızca biri bir satır günceller ve işi çalıştırır; diğerleri atlar. Süre
+veritabanında tutulduğundan uyuyup uyanan ya da yeniden başlayan instance
+aralığı baştan saymaz. Aynı iş ``flask`` komutuyla elle de çalıştırılabilir.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from models import db, JobRun, insert_missing
+
+
+def claim(name, interval, now=None):
+    """Record a run of job ``name`` if its last run is at least ``interval``
+    seconds old; True means this caller owns the run. Commits.
+    """
+    now = now or datetime.utcnow()
+    due = now - timedelta(seconds=interval)
+    last_run = db.session.scalar(db.select(JobRun.last_run_at).where(JobRun.name == name))
+    if last_run is not None and last_run > due:
+        return False  # okuma yeterli; yazma kilidi alınmaz
+    insert_missing(JobRun.__table__, {'name': name, 'last_run_at': None})
+    claimed = db.session.execute(
+        db.update(JobRun)
+        .where(JobRun.name == name, db.or_(JobRun.last_run_at.is_(None), JobRun.last_run_at <= due))
+        .values(last_run_at=now),
+        execution_options={'synchronize_session': False},
+    ).rowcount == 1
+    db.session.commit()
+    return claimed
+
+
+class PeriodicJobs:
+    """Registry of periodic jobs with a lazily started, per-process runner thread."""
+
+    def __init__(self, app=None, tick=60.0):
+        self.tick = tick
+        self.app = None
+        self.jobs = {}  # ad -> (aralık saniye, fonksiyon)
+        self._thread_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        if app.config.get('BACKGROUND_JOBS', True):
+            app.before_request(self.ensure_started)
+
+    def add(self, name, interval, func):
+        """Run ``func()`` (in an app context) at most every ``interval`` seconds."""
+        self.jobs[name] = (interval, func)
+
+    def ensure_started(self):
+        # Fork sonrası (gunicorn preload) her işçi kendi iş parçacığını başlatır
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid != os.getpid():
+                self._thread_pid = os.getpid()
+                threading.Thread(target=self._run, name='periodic-jobs', daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.tick)
+            self.run_due()
+
+    def run_due(self):
+        """Run every job whose interval has passed and that this process claims."""
+        ran = []
+        for name, (interval, func) in list(self.jobs.items()):
+            with self.app.app_context():
+                try:
+                    if not claim(name, interval):
+                        continue
+                    started = time.monotonic()
+                    result = func()
+                    self.app.logger.info('Job %s done', name, extra={
+                        'result': result, 'duration_ms': round((time.monotonic() - started) * 1000)})
+                    ran.append(name)
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('Job %s failed', name)
+        return ran
@@ -0,0 +1,162 @@
+"""Yapılandırılmış (JSON) ve bloklamayan loglama.
+
+İstek iş parçacıkları log kaydını yalnızca sınırlı bir kuyruğa bırakır; asıl
+yazma işini (stdout) ayrı bir ``QueueListener`` iş parçacığı yapar. Kuyruk
+doluysa kayıt beklemek yerine düşürülür ve sayılır, böylece yavaş bir log
+hedefi işçileri durduramaz.
+
+* Her kayıt o anki isteğin kimliğini (``request_id``) taşır; kimlik gelen
+  ``X-Request-ID`` başlığından alınır ya da üretilir ve yanıta eklenir.
+* DEBUG kayıtları ``LOG_DEBUG_SAMPLE_RATE`` oranında örneklenir; yoğun
+  olaylar ``extra={'sample_rate': ...}`` ile kendi oranını verebilir.
+* Seviye ``LOG_LEVEL``, biçim ``LOG_FORMAT`` (``json`` / ``text``) ile seçilir.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+# LogRecord'un kendi alanları; bunların dışındakiler ``extra`` olarak JSON'a girer
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id, extras."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request id (captured in the request thread)."""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id') if has_request_context() else None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only ``rate`` of DEBUG records; other levels always pass.
+    A record logged with ``extra={'sample_rate': r}`` is sampled at ``r``
+    whatever its level, for high-volume events.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        rate = getattr(record, 'sample_rate', None)
+        if rate is None:
+            if record.levelno > logging.DEBUG:
+                return True
+            rate = self.rate
+        return rate >= 1 or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops instead of blocking and restarts its listener after fork."""
+
+    def __init__(self, log_queue, *handlers):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._handlers = handlers
+        self._listener = None
+        self._pid = None
+        self.start_listener()
+
+    def start_listener(self):
+        if self._pid is not None:
+            # Gunicorn preload: fork edilen işçide dinleyici iş parçacığı yoktur ve
+            # devralınan kuyruğun kilidi ebeveynde tutuluyor olabilir; yenisi kurulur
+            self.queue = queue.Queue(self.queue.maxsize)
+        self._listener = QueueListener(self.queue, *self._handlers, respect_handler_level=True)
+        self._listener.start()
+        self._pid = os.getpid()
+
+    def stop_listener(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+
+    def prepare(self, record):
+        # Mesaj ve hata metni burada (istek iş parçacığında) hazırlanır, ama
+        # varsayılan davranışın aksine hata mesaja gömülmez; JSON'da ayrı alandır.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self.start_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(app):
+    """Route all logging through a bounded queue to stdout and add request ids."""
+    level = os.getenv('LOG_LEVEL', 'INFO').upper()
+    app.config['LOG_DEBUG_SAMPLE_RATE'] = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', 0.1))
+    app.config['REQUEST_ID_HEADER'] = os.getenv('REQUEST_ID_HEADER', 'X-Request-ID')
+
+    stream = logging.StreamHandler(sys.stdout)
+    if os.getenv('LOG_FORMAT', 'json') == 'json':
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'))
+
+    handler = NonBlockingQueueHandler(queue.Queue(int(os.getenv('LOG_QUEUE_SIZE', 10000))), stream)
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(SamplingFilter(app.config['LOG_DEBUG_SAMPLE_RATE']))
+    atexit.register(handler.stop_listener)
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    app.logger.setLevel(level)
+    app.extensions['log_handler'] = handler
+
+    header = app.config['REQUEST_ID_HEADER']
+
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get(header, '')
+        g.request_id = incoming[:64] if incoming else uuid.uuid4().hex
+
+    @app.after_request
+    def echo_request_id(response):
+        if 'request_id' in g:
+            response.headers[header] = g.request_id
+        return response
+
+    return handler
@@ -1,9 +1,27 @@
+import re
 from datetime import datetime
+from importlib import import_module
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy.orm import load_only, validates
 from werkzeug.security import generate_password_hash, check_password_hash
 
-db = SQLAlchemy()
+from db_routing import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """Whitespace-collapsed start of ``text``, cut at a word boundary."""
+    text = re.sub(r'\s+', ' ', text or '').strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' .,;:-') + '…'
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -15,8 +33,8 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # İlişkiler
-    recipes = db.relationship('Recipe', backref='author', lazy=True, cascade='all, delete-orphan')
-    comments = db.relationship('Comment', backref='user', lazy=True, cascade='all, delete-orphan')
+    recipes = db.relationship('Recipe', backref='author', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    comments = db.relationship('Comment', backref='user', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
@@ -56,20 +74,79 @@ class Recipe(db.Model):
     cook_time = db.Column(db.Integer)  # Pişirme süresi (dakika)
     servings = db.Column(db.Integer)  # Kaç kişilik
     image = db.Column(db.String(255))
-    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Yorum toplamları (yorum eklenip silindikçe SQL ile güncellenir)
+    comment_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    rating_sum = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    rating_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Popülerlik (trending.ViewCounter periyodik olarak yeniden hesaplar)
+    trending_score = db.Column(db.Float, default=0, server_default='0', nullable=False)
+    weekly_views = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Kartlarda gösterilen kısa özet; content her atandığında yeniden hesaplanır
+    excerpt = db.Column(db.String(EXCERPT_LENGTH + 1))
+    
+    __table_args__ = (
+        db.Index('ix_recipes_trending', 'trending_score'),
+        db.Index('ix_recipes_weekly_views', 'weekly_views'),
+        db.Index('ix_recipes_category_trending', 'category_id', 'trending_score'),
+        db.Index('ix_recipes_category_weekly_views', 'category_id', 'weekly_views'),
+    )
     
     # İlişkiler
-    comments = db.relationship('Comment', backref='recipe', lazy=True, cascade='all, delete-orphan')
-    images = db.relationship('Image', backref='recipe', lazy=True, cascade='all, delete-orphan')
+    comments = db.relationship('Comment', backref='recipe', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    images = db.relationship('Image', backref='recipe', lazy=True, cascade='all, delete-orphan', passive_deletes=True,
+                             order_by=lambda: (Image.position, Image.id))
+    
+    @validates('content')
+    def _sync_excerpt(self, key, content):
+        self.excerpt = make_excerpt(content)
+        return content
+    
+    @classmethod
+    def card_columns(cls):
+        """Loader option for listings: only what recipe cards render, none of the large text columns.
+        Categories come in one extra query; their name is part of the card cache key.
+        """
+        return load_only(
+            cls.id, cls.title, cls.excerpt, cls.image, cls.prep_time, cls.cook_time, cls.servings,
+            cls.category_id, cls.user_id, cls.created_at, cls.updated_at,
+            cls.comment_count, cls.rating_sum, cls.rating_count, cls.trending_score, cls.weekly_views,
+        ).selectinload(cls.category)
     
     def average_rating(self):
-        if not self.comments:
-            return 0
-        ratings = [c.rating for c in self.comments if c.rating]
-        return sum(ratings) / len(ratings) if ratings else 0
+        return self.rating_sum / self.rating_count if self.rating_count else 0
+    
+    @classmethod
+    def record_comment(cls, recipe_id, rating):
+        """Bump the stored aggregates for one new comment."""
+        db.session.execute(
+            db.update(cls).where(cls.id == recipe_id).values(
+                comment_count=cls.comment_count + 1,
+                rating_sum=cls.rating_sum + (rating or 0),
+                rating_count=cls.rating_count + (1 if rating else 0),
+                updated_at=cls.updated_at,  # yorum, tarifin kendisini değiştirmez
+            ),
+            # Türetilmiş kolonlar; yorumun kendi olayı değişiklik akışına yazılır
+            execution_options={'synchronize_session': False, 'change_feed': False},
+        )
+    
+    @classmethod
+    def refresh_comment_stats(cls, recipe_ids):
+        """Recompute the aggregates of ``recipe_ids`` in a single UPDATE."""
+        def per_recipe(expr):
+            return db.select(expr).where(Comment.recipe_id == cls.id).scalar_subquery()
+        db.session.execute(
+            db.update(cls).where(cls.id.in_(recipe_ids)).values(
+                comment_count=per_recipe(db.func.count(Comment.id)),
+                rating_sum=per_recipe(db.func.coalesce(db.func.sum(Comment.rating), 0)),
+                rating_count=per_recipe(db.func.count(Comment.rating)),
+                updated_at=cls.updated_at,
+            ),
+            execution_options={'synchronize_session': False, 'change_feed': False},
+        )
     
     def __repr__(self):
         return f'<Recipe {self.title}>'
@@ -79,16 +156,31 @@ class Comment(db.Model):
     __tablename__ = 'comments'
     
     id = db.Column(db.Integer, primary_key=True)
-    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     body = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer)  # 1-5 yıldız
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Tarif sayfasındaki sayfalama (recipe_id, created_at, id) üzerinden yapılır
+    __table_args__ = (db.Index('ix_comments_recipe_created', 'recipe_id', 'created_at', 'id'),)
+    
     def __repr__(self):
         return f'<Comment {self.id} on Recipe {self.recipe_id}>'
 
 
+class RecipeView(db.Model):
+    """Günlük görüntülenme sayısı - sayaçlar bellekte biriktirilip toplu yazılır"""
+    __tablename__ = 'recipe_views'
+    
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True, index=True)
+    views = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<RecipeView {self.recipe_id} {self.day}: {self.views}>'
+
+
 class Page(db.Model):
     __tablename__ = 'pages'
     
@@ -108,8 +200,160 @@ class Image(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
-    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable=False)
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), nullable=False, index=True)
+    position = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # galeri sırası
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (db.Index('ix_images_recipe_position', 'recipe_id', 'position'),)
+    
     def __repr__(self):
         return f'<Image {self.filename}>'
+
+
+class ChangeEvent(db.Model):
+    """Değişiklik akışı (outbox): izlenen tablolardaki her yazma, yazmayla aynı
+    transaction'da buraya bir satır ekler (bkz. changefeed.py)"""
+    __tablename__ = 'change_events'
+    
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    entity = db.Column(db.String(50), nullable=False)  # tablo adı, örn. 'recipes'
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # insert / update / delete
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (db.Index('ix_change_events_entity', 'entity', 'entity_id', 'id'),)
+    
+    def __repr__(self):
+        return f'<ChangeEvent {self.id} {self.op} {self.entity}:{self.entity_id}>'
+
+
+class ChangeFeedOffset(db.Model):
+    """Bir değişiklik akışı tüketicisinin en son işlediği olay"""
+    __tablename__ = 'change_feed_offsets'
+    
+    consumer = db.Column(db.String(100), primary_key=True)
+    position = db.Column(db.BigInteger, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ChangeFeedOffset {self.consumer}: {self.position}>'
+
+
+class JobRun(db.Model):
+    """Periyodik bir işin son çalıştırılma zamanı; işçiler arası sahiplenme (bkz. jobs.py)"""
+    __tablename__ = 'job_runs'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    last_run_at = db.Column(db.DateTime)  # UTC
+    
+    def __repr__(self):
+        return f'<JobRun {self.name}: {self.last_run_at}>'
+
+
+class LoginThrottle(db.Model):
+    __tablename__ = 'login_throttle'
+    
+    key = db.Column(db.String(200), primary_key=True)  # örn. "login-ip:1.2.3.4"
+    tokens = db.Column(db.Float, nullable=False)
+    updated = db.Column(db.Float, nullable=False)  # time.time()
+    failures = db.Column(db.Integer, default=0, nullable=False)
+    blocked_until = db.Column(db.Float, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<LoginThrottle {self.key}>'
+
+
+# Diyalekt modülleri ilk kullanımda yüklenir (açılış süresi)
+_ON_CONFLICT_DIALECTS = ('postgresql', 'sqlite')
+
+
+def insert_missing(table, row):
+    """INSERT ``row`` into ``table`` unless its primary key already exists.
+    Safe against a concurrent insert of the same key (ON CONFLICT DO NOTHING).
+    Runs on the session's primary connection. Returns True if a row was inserted.
+    """
+    conn = db.session.connection(bind_arguments={'clause': db.insert(table)})
+    if conn.dialect.name in _ON_CONFLICT_DIALECTS:
+        stmt = import_module(f'sqlalchemy.dialects.{conn.dialect.name}').insert(table)
+        return conn.execute(stmt.values(row).on_conflict_do_nothing()).rowcount == 1
+    # Diğer veritabanları: yarışta ikinci INSERT birincil anahtar hatası verebilir
+    key = [table.c[column.name] == row[column.name] for column in table.primary_key]
+    if conn.execute(db.select(db.literal(1)).select_from(table).where(*key)).first():
+        return False
+    conn.execute(db.insert(table).values(row))
+    return True
+
+
+# create_all() mevcut tablolara kolon/indeks eklemez; sonradan eklenenler burada
+ADDED_COLUMNS = {
+    'recipes': ('comment_count', 'rating_sum', 'rating_count', 'trending_score', 'weekly_views', 'excerpt'),
+    'images': ('position', 'width', 'height'),
+}
+# Modelden kaldırılan kolonlar ve önce silinmesi gereken indeksleri
+DROPPED_COLUMNS = {
+    'change_events': {'version': ('ix_change_events_entity',)},
+}
+
+
+def upgrade_schema():
+    """Add columns and indexes introduced after a table was first created.
+    Returns the ``table.column`` names that were added.
+    """
+    inspector = db.inspect(db.engine)
+    added = []
+    with db.engine.begin() as conn:
+        for table_name, columns in ADDED_COLUMNS.items():
+            existing = {column['name'] for column in inspector.get_columns(table_name)}
+            table = db.metadata.tables[table_name]
+            for name in columns:
+                if name in existing:
+                    continue
+                column = table.c[name]
+                ddl = f'ALTER TABLE {table_name} ADD COLUMN {name} {column.type.compile(db.engine.dialect)}'
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                if not column.nullable:
+                    ddl += ' NOT NULL'
+                conn.execute(db.text(ddl))
+                added.append(f'{table_name}.{name}')
+        for table_name, columns in DROPPED_COLUMNS.items():
+            if not inspector.has_table(table_name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table_name)}
+            for name, indexes in columns.items():
+                if name not in existing:
+                    continue
+                for index in indexes:
+                    conn.execute(db.text(f'DROP INDEX IF EXISTS {index}'))
+                conn.execute(db.text(f'ALTER TABLE {table_name} DROP COLUMN {name}'))
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    if 'recipes.comment_count' in added:
+        Recipe.refresh_comment_stats(db.select(Recipe.id))
+        db.session.commit()
+    if 'recipes.excerpt' in added:
+        backfill_excerpts()
+    return added
+
+
+def backfill_excerpts(batch_size=500):
+    """Fill ``Recipe.excerpt`` for rows that predate the column, in id order."""
+    table = Recipe.__table__
+    last_id, filled = 0, 0
+    while True:
+        rows = db.session.execute(
+            db.select(table.c.id, table.c.content).where(table.c.id > last_id, table.c.excerpt.is_(None))
+            .order_by(table.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return filled
+        db.session.execute(
+            db.update(table).where(table.c.id == db.bindparam('recipe_id'))
+            .values(excerpt=db.bindparam('text'), updated_at=table.c.updated_at),
+            [{'recipe_id': recipe_id, 'text': make_excerpt(content)} for recipe_id, content in rows],
+        )
+        db.session.commit()
+        last_id, filled = rows[-1].id, filled + len(rows)
@@ -0,0 +1,186 @@
+"""İşçi içinde isteğe bağlı örnekleyici (sampling) profiler.
+
+Bir profil oturumu açıkken arka plandaki bir iş parçacığı ``interval``
+aralıklarla ``sys._current_frames()`` ile yalnızca o anda istek işleyen
+iş parçacıklarının yığınlarını okur ve "collapsed stack" sayımları biriktirir.
+Oturum süre dolunca ya da hedef uç noktanın (endpoint) ``max_requests``
+isteği bitince kapanır. Oturum yokken maliyet, istek başına tek bir
+``None`` kontrolüdür.
+
+Sonuç Brendan Gregg'in collapsed biçiminde (flamegraph.pl) veya
+speedscope JSON'u olarak alınabilir.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_STACK_DEPTH = 128
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profile is already running in this worker."""
+
+
+def _frame_label(code):
+    return f'{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}'
+
+
+class ProfileSession:
+    """One bounded profiling run; samples request threads until it finishes."""
+
+    def __init__(self, seconds, interval, endpoint=None, max_requests=None, exclude=()):
+        self.seconds = seconds
+        self.interval = interval
+        self.endpoint = endpoint
+        self.max_requests = max_requests
+        self.exclude = set(exclude)
+        self.stacks = Counter()
+        self.frames = {}  # etiket -> (dosya, fonksiyon, satır)
+        self.samples = 0
+        self.requests = 0
+        self.started_at = time.time()
+        self.finished_at = None
+        self._threads = set()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    # ----- istek kancaları -----
+
+    def matches(self, endpoint):
+        if endpoint in self.exclude:
+            return False
+        return self.endpoint is None or endpoint == self.endpoint
+
+    def enter(self, thread_id):
+        with self._lock:
+            self._threads.add(thread_id)
+
+    def leave(self, thread_id):
+        with self._lock:
+            if thread_id in self._threads:
+                self._threads.discard(thread_id)
+                self.requests += 1
+                if self.max_requests and self.requests >= self.max_requests:
+                    self._done.set()
+
+    # ----- örnekleme -----
+
+    def _sample(self):
+        with self._lock:
+            threads = tuple(self._threads)
+        if not threads:
+            return
+        frames = sys._current_frames()
+        for thread_id in threads:
+            frame = frames.get(thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                label = _frame_label(code)
+                if label not in self.frames:
+                    self.frames[label] = (code.co_filename, code.co_name, code.co_firstlineno)
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def run(self):
+        deadline = time.monotonic() + self.seconds
+        while not self._done.is_set() and time.monotonic() < deadline:
+            self._sample()
+            time.sleep(self.interval)
+        self.finished_at = time.time()
+        self._done.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    # ----- çıktı -----
+
+    def status(self):
+        return {
+            'pid': os.getpid(), 'endpoint': self.endpoint, 'seconds': self.seconds,
+            'interval_ms': self.interval * 1000, 'max_requests': self.max_requests,
+            'requests': self.requests, 'samples': self.samples,
+            'started_at': self.started_at, 'finished': self.finished,
+        }
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def speedscope(self):
+        labels = list(self.frames)
+        index = {label: i for i, label in enumerate(labels)}
+        samples, weights = [], []
+        for stack, count in self.stacks.items():
+            samples.append([index[label] for label in stack.split(';')])
+            weights.append(count * self.interval * 1000)
+        duration = ((self.finished_at or time.time()) - self.started_at) * 1000
+        name = f'pid {os.getpid()}' + (f' {self.endpoint}' if self.endpoint else '')
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': [
+                {'name': func, 'file': path, 'line': line}
+                for path, func, line in (self.frames[label] for label in labels)
+            ]},
+            'profiles': [{
+                'type': 'sampled', 'name': name, 'unit': 'milliseconds',
+                'startValue': 0, 'endValue': duration, 'samples': samples, 'weights': weights,
+            }],
+            'name': name,
+            'exporter': 'nefisyemekler',
+        }
+
+
+class SamplingProfiler:
+    """Per-worker owner of at most one ProfileSession (plus the last finished one)."""
+
+    def __init__(self, max_seconds=60.0, min_interval=0.001, max_requests=1000):
+        self.max_seconds = max_seconds
+        self.min_interval = min_interval
+        self.max_requests = max_requests
+        self.session = None  # çalışan oturum; istek kancaları yalnızca buna bakar
+        self.last = None
+        self._lock = threading.Lock()
+
+    def start(self, seconds, interval, endpoint=None, max_requests=None, exclude=()):
+        session = ProfileSession(
+            seconds=min(max(seconds, 0.1), self.max_seconds),
+            interval=max(interval, self.min_interval),
+            endpoint=endpoint,
+            max_requests=min(max_requests, self.max_requests) if max_requests else None,
+            exclude=exclude,
+        )
+        with self._lock:
+            if self.session is not None:
+                raise ProfilerBusy('A profile is already running in this worker.')
+            self.session = session
+        threading.Thread(target=self._run, args=(session,), name='sampling-profiler', daemon=True).start()
+        return session
+
+    def _run(self, session):
+        try:
+            session.run()
+        finally:
+            with self._lock:
+                self.last = session
+                self.session = None
+
+    # ----- Flask kancaları -----
+
+    def before_request(self, endpoint):
+        session = self.session
+        if session is not None and session.matches(endpoint):
+            session.enter(threading.get_ident())
+
+    def teardown_request(self):
+        session = self.session
+        if session is not None:
+            session.leave(threading.get_ident())
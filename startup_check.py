@@ -0,0 +1,99 @@
+"""Açılış süresi bütçesi kontrolü.
+
+Uyuyan (free tier) instance uyandığında geçen sürenin büyük kısmı modül
+importlarıdır. Bu betik uygulamayı temiz bir Python sürecinde
+``-X importtime`` ile import eder, en pahalı importları raporlar ve
+
+* toplam import süresi ``--budget-ms`` değerini aşarsa,
+* tembel yüklenmesi gereken modüllerden (``LAZY_MODULES``) biri açılışta
+  import edilmişse
+
+sıfırdan farklı bir kodla çıkar. Aynı kontrol ``tests/test_startup.py``'de
+pytest ile de çalışır.
+
+    python3 startup_check.py --budget-ms 1500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Yalnızca ihtiyaç olduğunda import edilmesi gereken ağır modüller
+LAZY_MODULES = ('requests', 'sqlalchemy.dialects.postgresql')
+DEFAULT_BUDGET_MS = 1500
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.app.test_client().get('/')
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (time.perf_counter() - imported) * 1000,
+    'modules': sorted(sys.modules),
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """Return ``[(cumulative_us, module)]`` for imports made directly by the probe."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        indent = len(name) - len(name.lstrip())
+        if indent <= 3:  # yalnızca probe'un ve app'in doğrudan importları
+            rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+def run_probe(env_overrides):
+    env = dict(os.environ, **env_overrides)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['imports'] = parse_importtime(result.stderr)
+    return report
+
+
+def problems(report, budget_ms=DEFAULT_BUDGET_MS):
+    """Budget violations in a probe report, as messages; empty if within budget."""
+    found = []
+    eager = [name for name in LAZY_MODULES if name in report['modules']]
+    if eager:
+        found.append(f"Imported at startup but should be lazy: {', '.join(eager)}")
+    if report['import_ms'] > budget_ms:
+        found.append(f"Import time is over budget ({report['import_ms']:.0f} ms > {budget_ms:.0f} ms)")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help='İzin verilen en uzun import süresi.')
+    parser.add_argument('--top', type=int, default=10, help='Raporlanacak en pahalı import sayısı.')
+    args = parser.parse_args()
+
+    # Ölçüm, deploy edilen açılışla aynı koşullarda yapılır (build.sh DB'yi hazırlar)
+    report = run_probe({'DB_INIT_ON_STARTUP': '0'})
+
+    print(f"Import: {report['import_ms']:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"First request: {report['first_request_ms']:.0f} ms")
+    print('Slowest imports:')
+    for cumulative, name in sorted(report['imports'], reverse=True)[:args.top]:
+        print(f'  {cumulative / 1000:8.1f} ms  {name}')
+
+    found = problems(report, args.budget_ms)
+    for message in found:
+        print(f'✗ {message}')
+    if not found:
+        print('✓ Startup within budget')
+    return 1 if found else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
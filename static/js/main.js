@@ -107,3 +107,73 @@ function previewImage(input) {
 function confirmDelete(message) {
     return confirm(message || 'Bu işlemi geri alamazsınız. Emin misiniz?');
 }
+
+// Admin toplu işlemler: tablodaki tüm kutuları seç / bırak
+function toggleAllCheckboxes(source, formId) {
+    document.querySelectorAll('input[name="ids"][form="' + formId + '"]').forEach(function(box) {
+        box.checked = source.checked;
+    });
+}
+
+// Arama kutusu otomatik tamamlama (yazmayı bırakınca 200ms sonra sorgular)
+document.addEventListener('DOMContentLoaded', function() {
+    const inputs = document.querySelectorAll('input[name="q"]');
+    const typeIcons = { recipe: 'fa-utensils', category: 'fa-tags', ingredient: 'fa-carrot' };
+
+    inputs.forEach(function(input) {
+        const form = input.closest('form');
+        if (!form) return;
+        form.classList.add('position-relative');
+        input.setAttribute('autocomplete', 'off');
+
+        const list = document.createElement('div');
+        list.className = 'autocomplete-list d-none';
+        form.appendChild(list);
+
+        let timer = null;
+        let controller = null;
+
+        function hide() {
+            list.classList.add('d-none');
+            list.innerHTML = '';
+        }
+
+        function render(items) {
+            list.innerHTML = '';
+            if (!items.length) return hide();
+            items.forEach(function(item) {
+                const link = document.createElement('a');
+                link.href = item.url;
+                link.className = 'autocomplete-item';
+                const icon = document.createElement('i');
+                icon.className = 'fas ' + (typeIcons[item.type] || 'fa-search') + ' me-2';
+                link.appendChild(icon);
+                link.appendChild(document.createTextNode(item.label));
+                list.appendChild(link);
+            });
+            list.classList.remove('d-none');
+        }
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            const query = input.value.trim();
+            if (query.length < 2) return hide();
+            timer = setTimeout(function() {
+                if (controller) controller.abort();
+                controller = new AbortController();
+                fetch('/search/suggest?q=' + encodeURIComponent(query), { signal: controller.signal })
+                    .then(function(response) { return response.json(); })
+                    .then(render)
+                    .catch(function() {});
+            }, 200);
+        });
+
+        input.addEventListener('keydown', function(e) {
+            if (e.key === 'Escape') hide();
+        });
+
+        document.addEventListener('click', function(e) {
+            if (!form.contains(e.target)) hide();
+        });
+    });
+});
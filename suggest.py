@@ -0,0 +1,240 @@
+"""Arama kutusu için bellek içi önek (prefix) indeksi.
+
+Tarif başlıklarındaki kelimeler, kategori adları ve sık geçen malzemeler
+Türkçe'ye göre normalize edilip sıralı bir listede tutulur; sorgu ``bisect``
+ile O(log n) sürede cevaplanır. Yazma işlemleri indeksi yerinde günceller,
+diğer işçilerin değişiklikleri ise değişiklik akışından (changefeed.py)
+okunup yalnızca değişen tarifler güncellenir.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+from changefeed import ChangeConsumer, DELETE, head, latest_changes
+from models import db, Category, Recipe
+
+KIND_CATEGORY, KIND_RECIPE, KIND_INGREDIENT = 0, 1, 2
+
+_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+_WORD = re.compile(r'\w+')
+_QUANTITY = re.compile(
+    r'^[\d\s/.,½¼¾-]*(g|gr|kg|ml|lt|litre|adet|paket|diş|demet|tutam|çimdik|kase|fincan|'
+    r'su bardağı|çay bardağı|yemek kaşığı|tatlı kaşığı|çay kaşığı|kahve fincanı)?\b\s*'
+)
+
+
+def normalize(text):
+    """Turkish-aware lower-casing with diacritics folded (Çorba -> corba)."""
+    return text.replace('I', 'ı').replace('İ', 'i').lower().translate(_FOLD).strip()
+
+
+def ingredient_names(ingredients):
+    """Extract bare ingredient names from a free-text ingredient list."""
+    for line in (ingredients or '').splitlines():
+        for part in line.split(','):
+            name = _QUANTITY.sub('', part.strip().lower()).strip(' .-')
+            if 2 < len(name) <= 40:
+                yield name
+
+
+class PrefixIndex:
+    """Sorted array of ``(key, kind, label, ref)`` tuples searched with bisect."""
+
+    def __init__(self, min_ingredient_count=2):
+        self.min_ingredient_count = min_ingredient_count
+        self._entries = []
+        self._recipes = {}  # recipe_id -> (entries, ingredient names)
+        self._ingredients = Counter()
+        self._lock = threading.Lock()
+        self._loading = False
+
+    # ----- yazma -----
+
+    def _insert(self, entry):
+        if self._loading:
+            self._entries.append(entry)
+        else:
+            insort(self._entries, entry)
+
+    def bulk_load(self, load):
+        """Call ``load(self)`` with inserts appended unsorted, then sort once."""
+        self._loading = True
+        try:
+            load(self)
+        finally:
+            self._loading = False
+            self._entries.sort()
+
+    def _remove(self, entry):
+        i = bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    def _recipe_entries(self, recipe_id, title):
+        entries = {(normalize(title), KIND_RECIPE, title, recipe_id)}
+        for match in _WORD.finditer(title):
+            if match.start():
+                entries.add((normalize(title[match.start():]), KIND_RECIPE, title, recipe_id))
+        return sorted(entries)
+
+    def _count_ingredient(self, name, delta):
+        before = self._ingredients[name]
+        after = before + delta
+        if after > 0:
+            self._ingredients[name] = after
+        else:
+            del self._ingredients[name]
+        entry = (normalize(name), KIND_INGREDIENT, name, name)
+        if before < self.min_ingredient_count <= after:
+            self._insert(entry)
+        elif after < self.min_ingredient_count <= before:
+            self._remove(entry)
+
+    def _remove_recipe(self, recipe_id):
+        entries, ingredients = self._recipes.pop(recipe_id, ((), ()))
+        for entry in entries:
+            self._remove(entry)
+        for name in ingredients:
+            self._count_ingredient(name, -1)
+
+    def put_recipe(self, recipe_id, title, ingredients=None):
+        with self._lock:
+            self._remove_recipe(recipe_id)
+            entries = self._recipe_entries(recipe_id, title)
+            names = set(ingredient_names(ingredients))
+            for entry in entries:
+                self._insert(entry)
+            for name in names:
+                self._count_ingredient(name, 1)
+            self._recipes[recipe_id] = (entries, names)
+
+    def remove_recipe(self, recipe_id):
+        with self._lock:
+            self._remove_recipe(recipe_id)
+
+    def put_category(self, name, slug):
+        with self._lock:
+            self._insert((normalize(name), KIND_CATEGORY, name, slug))
+
+    # ----- okuma -----
+
+    def search(self, query, limit=8):
+        """Return up to ``limit`` ``(kind, label, ref)`` whose key starts with query."""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        results, seen = [], set()
+        entries = self._entries
+        i = bisect_left(entries, (prefix,))
+        while i < len(entries) and len(results) < limit:
+            key, kind, label, ref = entries[i]
+            if not key.startswith(prefix):
+                break
+            if (kind, ref) not in seen:
+                seen.add((kind, ref))
+                results.append((kind, label, ref))
+            i += 1
+        results.sort(key=lambda r: r[0])
+        return results
+
+
+class SuggestionService:
+    """Owns the per-process index and keeps it consistent across workers.
+
+    At most every ``check_interval`` seconds the recipe and category events
+    written since the last check are read from the change feed and the
+    changed recipes are re-indexed in place. A category change, or more than
+    ``max_catch_up`` events, rebuilds the index; so does ``max_age``.
+    """
+
+    def __init__(self, check_interval=5.0, max_age=3600.0, ingredient_sample=5000, max_catch_up=2000):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.ingredient_sample = ingredient_sample
+        self.index = None
+        self.feed = ChangeConsumer(entities=(Recipe.__tablename__, Category.__tablename__), batch_size=max_catch_up)
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._rebuild_lock = threading.Lock()
+
+    def rebuild(self):
+        index = PrefixIndex()
+        # Yükleme sırasında gelen değişiklikler bir sonraki kontrolde yeniden uygulanır
+        position = head()
+
+        def load(index):
+            for name, slug in db.session.execute(db.select(Category.name, Category.slug)):
+                index.put_category(name, slug)
+            # Malzemeler yalnızca en yeni tariflerden örneklenir; tüm metni okumaya gerek yok
+            recent = db.select(Recipe.id).order_by(Recipe.id.desc()).limit(self.ingredient_sample).subquery()
+            rows = db.session.execute(
+                db.select(Recipe.id, Recipe.title, Recipe.ingredients)
+                .join(recent, recent.c.id == Recipe.id)
+            )
+            sampled = set()
+            for recipe_id, title, ingredients in rows:
+                index.put_recipe(recipe_id, title, ingredients)
+                sampled.add(recipe_id)
+            rows = db.session.execute(
+                db.select(Recipe.id, Recipe.title).execution_options(yield_per=5000)
+            )
+            for recipe_id, title in rows:
+                if recipe_id not in sampled:
+                    index.put_recipe(recipe_id, title)
+
+        index.bulk_load(load)
+        self.index = index
+        self.feed.seek(position)
+        self._built_at = self._checked_at = time.monotonic()
+
+    def catch_up(self):
+        """Apply feed events since the last check; False if a rebuild is needed instead."""
+        changes, position = self.feed.fetch()
+        if len(changes) >= self.feed.batch_size or any(c.entity == Category.__tablename__ for c in changes):
+            return False
+        latest = latest_changes(changes)
+        ids = [entity_id for (_, entity_id), change in latest.items() if change.op != DELETE]
+        rows = {
+            recipe_id: (title, ingredients)
+            for recipe_id, title, ingredients in db.session.execute(
+                db.select(Recipe.id, Recipe.title, Recipe.ingredients).where(Recipe.id.in_(ids))
+            )
+        } if ids else {}
+        for _, recipe_id in latest:
+            if recipe_id in rows:
+                self.index.put_recipe(recipe_id, *rows[recipe_id])
+            else:
+                self.index.remove_recipe(recipe_id)
+        self.feed.seek(position)
+        return True
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if self.index is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._rebuild_lock:
+            if self.index is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return
+            if self.index is None or now - self._built_at > self.max_age or not self.catch_up():
+                self.rebuild()
+            else:
+                self._checked_at = now
+
+    def search(self, query, limit=8):
+        self.ensure_fresh()
+        return self.index.search(query, limit)
+
+    # Bu işçideki yazmalar hemen görünsün; aynı olay akıştan gelince tekrar uygulanır
+    def recipe_saved(self, recipe):
+        if self.index is not None:
+            self.index.put_recipe(recipe.id, recipe.title, recipe.ingredients)
+
+    def recipe_deleted(self, *recipe_ids):
+        if self.index is not None:
+            for recipe_id in recipe_ids:
+                self.index.remove_recipe(recipe_id)
+
+    def invalidate(self):
+        self.index = None
@@ -0,0 +1,68 @@
+"""Test ortamı: uygulama geçici bir SQLite veritabanıyla yüklenir, her test boş
+tablolarla başlar. Ortam değişkenleri ``app`` import edilmeden önce ayarlanmalı.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_tmp = tempfile.mkdtemp(prefix='nefisyemekler-test-')
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{os.path.join(_tmp, 'test.db')}",
+    'SECRET_KEY': 'test',
+    'DB_INIT_ON_STARTUP': '0',
+    'PROXY_FIX_X_FOR': '1',
+    'LOGIN_THROTTLE_BACKEND': 'memory',
+    'LOG_LEVEL': 'WARNING',
+    'BACKGROUND_JOBS': '0',
+})
+
+
+@pytest.fixture
+def app():
+    from app import app as flask_app, db, user_cache, throttle_store
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        user_cache.clear()
+        throttle_store.clear()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    from models import db, User
+
+    def make(username, password='secret123', is_admin=False):
+        user = User(username=username, is_admin=is_admin)
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_recipe(app, make_user):
+    from models import db, Category, Recipe
+
+    def make(title='Mercimek çorbası', user=None, category=None, **fields):
+        if category is None:
+            category = Category.query.filter_by(slug='corbalar').first() or Category(name='Çorbalar', slug='corbalar')
+        if user is None:
+            user = make_user(f'cook{Recipe.query.count()}')
+        recipe = Recipe(title=title, content=fields.pop('content', 'Tarif metni.'), category=category, author=user, **fields)
+        db.session.add(recipe)
+        db.session.commit()
+        return recipe
+    return make
@@ -0,0 +1,56 @@
+import tracemalloc
+from datetime import datetime
+
+import app as app_module
+from models import db, Category, Recipe
+
+# Tepe bellek, sunucu tarafı imlecin bir partisi (yield_per) kadar satırla sınırlı
+# olmalı; parti küçültülür ki N partinin birkaç katı olsun ve test hızlı kalsın
+YIELD_PER = 50
+N = 300
+
+
+def add_recipes(count, category, user):
+    now = datetime.utcnow()
+    db.session.execute(db.insert(Recipe), [
+        {'title': f'Tarif {n} ' + 'x' * 80, 'content': 'Tarif metni.', 'category_id': category.id,
+         'user_id': user.id, 'created_at': now, 'updated_at': now}
+        for n in range(count)
+    ])
+    db.session.commit()
+
+
+def streamed_peak(client, path):
+    """Consume a streamed response chunk by chunk; return (bytes, tracemalloc peak)."""
+    tracemalloc.start()
+    try:
+        response = client.get(path, buffered=False)
+        assert response.status_code == 200
+        assert response.is_streamed
+        size = 0
+        for chunk in response.response:
+            size += len(chunk)
+        response.close()
+        return size, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_admin_listing_memory_does_not_grow_with_rows(client, make_user, monkeypatch):
+    monkeypatch.setattr(app_module, 'ADMIN_YIELD_PER', YIELD_PER)
+    admin = make_user('admin', password='admin123', is_admin=True)
+    category = Category(name='Çorbalar', slug='corbalar')
+    db.session.add(category)
+    db.session.commit()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    client.get('/')  # giriş flash mesajı
+    streamed_peak(client, '/admin/recipes')  # şablon derleme ve önbellekler ölçüme girmesin
+
+    add_recipes(N, category, admin)
+    small_size, small_peak = streamed_peak(client, '/admin/recipes')
+    add_recipes(9 * N, category, admin)
+    large_size, large_peak = streamed_peak(client, '/admin/recipes')
+
+    assert large_size > 8 * small_size
+    # Gövde 10 kat büyürken tepe bellek sabit kalır
+    assert large_peak < 1.5 * small_peak, (small_peak, large_peak)
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+from sqlalchemy import event
+
+from app import delete_user_cascade
+from models import db, Comment, Image, Recipe, User
+
+COMMENTS = 10_000
+
+
+@pytest.fixture
+def statements(app):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', count)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', count)
+
+
+def add_comments(rows):
+    db.session.execute(db.insert(Comment), rows)
+    Recipe.refresh_comment_stats({row['recipe_id'] for row in rows})
+    db.session.commit()
+
+
+@pytest.fixture
+def prolific(make_user, make_recipe):
+    """A user with 10k comments on other people's recipes and two own recipes."""
+    spammer, author, reader = make_user('spammer'), make_user('author'), make_user('reader')
+    others = [make_recipe(f'Tarif {n}', user=author) for n in range(20)]
+    own = [make_recipe(f'Kendi tarifi {n}', user=spammer) for n in range(2)]
+    rows = [{'recipe_id': others[n % len(others)].id, 'user_id': spammer.id, 'body': f'yorum {n}', 'rating': 1}
+            for n in range(COMMENTS)]
+    rows += [{'recipe_id': recipe.id, 'user_id': reader.id, 'body': 'güzel', 'rating': 5} for recipe in others]
+    rows += [{'recipe_id': recipe.id, 'user_id': reader.id, 'body': 'güzel', 'rating': 4} for recipe in own]
+    add_comments(rows)
+    db.session.add(Image(recipe_id=own[0].id, filename='own.jpg'))
+    db.session.commit()
+    return spammer, others, own
+
+
+def test_delete_user_with_10k_comments(app, prolific, statements):
+    spammer, others, own = prolific
+    spammer_id = spammer.id
+    own_ids, other_ids = [r.id for r in own], [r.id for r in others]
+    db.session.expire_all()
+    statements.clear()
+
+    started = time.perf_counter()
+    delete_user_cascade(spammer_id)
+    db.session.commit()
+    elapsed = time.perf_counter() - started
+    delete_statements = len(statements)
+
+    assert elapsed < 2.0
+    # Set tabanlı: satır sayısından bağımsız, sabit sayıda ifade
+    assert delete_statements <= 20, statements
+    assert db.session.get(User, spammer_id) is None
+    assert db.session.scalar(db.select(db.func.count()).select_from(Comment).where(Comment.user_id == spammer_id)) == 0
+    assert db.session.scalar(db.select(db.func.count()).select_from(Recipe).where(Recipe.id.in_(own_ids))) == 0
+    assert db.session.scalar(db.select(db.func.count()).select_from(Image)) == 0
+    # Diğer kullanıcıların tariflerinde yalnızca kalan yorumlar sayılır
+    for recipe in Recipe.query.filter(Recipe.id.in_(other_ids)):
+        assert (recipe.comment_count, recipe.rating_sum, recipe.rating_count) == (1, 5, 1)
+
+
+def test_orm_delete_relies_on_database_cascade(app, prolific):
+    spammer, others, own = prolific
+    spammer_id = spammer.id
+
+    db.session.delete(spammer)
+    db.session.commit()
+
+    # passive_deletes: ORM yorumları tek tek yüklemez, ON DELETE CASCADE siler
+    assert db.session.scalar(db.select(db.func.count()).select_from(Comment).where(Comment.user_id == spammer_id)) == 0
+    assert db.session.scalar(db.select(db.func.count()).select_from(Recipe).where(Recipe.user_id == spammer_id)) == 0
+    assert db.session.scalar(db.select(db.func.count()).select_from(Image)) == 0
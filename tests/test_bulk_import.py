@@ -0,0 +1,40 @@
+from sqlalchemy import event
+
+from bulk import import_records
+from models import db, Comment
+
+
+def test_comment_import_is_idempotent_and_reads_only_the_chunks_authors(app, make_user, make_recipe):
+    reader = make_user('reader')
+    recipe = make_recipe()
+    others = [make_user(f'guest{n}') for n in range(3)]
+    db.session.execute(db.insert(Comment), [
+        {'recipe_id': recipe.id, 'user_id': others[n % 3].id, 'body': f'Yorum {n}', 'rating': 4}
+        for n in range(300)
+    ])
+    db.session.execute(db.insert(Comment), [{'recipe_id': recipe.id, 'user_id': reader.id, 'body': 'Çok güzel', 'rating': 5}])
+    db.session.commit()
+    records = [
+        {'recipe_id': recipe.id, 'author': 'reader', 'body': 'Çok güzel', 'rating': 5},   # zaten var
+        {'recipe_id': recipe.id, 'author': 'reader', 'body': 'Tekrar yaptım', 'rating': 5},
+        {'recipe_id': recipe.id, 'author': 'reader', 'body': 'Tekrar yaptım', 'rating': 5},  # parça içinde tekrar
+    ]
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        result = import_records('comments', records)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert result == {'read': 3, 'inserted': 1, 'skipped': 2}
+    assert import_records('comments', records)['inserted'] == 0
+    assert Comment.query.filter_by(user_id=reader.id).count() == 2
+    lookup = [(sql, params) for sql, params in statements if 'comments.body' in sql and sql.lstrip().startswith('SELECT')]
+    assert len(lookup) == 1
+    sql, params = lookup[0]
+    assert 'comments.user_id' in sql.split('WHERE', 1)[1]
+    assert tuple(params) == (recipe.id, reader.id)  # yalnızca (tarif, reader) çifti sorulur
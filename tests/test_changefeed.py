@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import changefeed
+from changefeed import ChangeConsumer, prune, pruned_position
+from models import db, ChangeEvent, upgrade_schema
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(changefeed.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def add_event(event_id, entity_id=1, created_at=None):
+    db.session.add(ChangeEvent(id=event_id, entity='recipes', entity_id=entity_id, op='update',
+                               created_at=created_at or datetime.utcnow()))
+    db.session.commit()
+
+
+def ids(changes):
+    return [change.id for change in changes]
+
+
+def test_gap_grace_counts_from_when_the_consumer_saw_the_gap(app, clock):
+    consumer = ChangeConsumer(gap_grace=5)
+    add_event(1)
+    # 3, 2'den çok önce flush edildi ama 2'nin transaction'ı henüz commit etmedi
+    add_event(3, created_at=datetime.utcnow() - timedelta(minutes=10))
+
+    changes, position = consumer.fetch()
+    assert (ids(changes), position) == ([1], 1)
+    consumer.seek(position)
+
+    clock[0] += 4
+    assert consumer.fetch() == ([], 1)
+
+    add_event(2)
+    changes, position = consumer.fetch()
+    assert (ids(changes), position) == ([2, 3], 3)
+
+
+def test_gap_is_skipped_after_grace(app, clock):
+    consumer = ChangeConsumer(gap_grace=5)
+    add_event(1)
+    add_event(4)
+    consumer.seek(consumer.fetch()[1])
+    clock[0] += 3
+    add_event(6)
+    assert consumer.fetch()[1] == 1
+
+    clock[0] += 2
+    changes, position = consumer.fetch()
+    # 2-3 yeterince beklendi; 5'in eksikliği ancak şimdi görüldü
+    assert (ids(changes), position) == ([4], 4)
+    consumer.seek(position)
+
+    clock[0] += 5
+    assert ids(consumer.fetch()[0]) == [6]
+
+
+def test_pruned_holes_are_not_waited_for(app, clock):
+    old = datetime.utcnow() - timedelta(days=10)
+    for event_id in range(1, 6):
+        add_event(event_id, entity_id=event_id % 2, created_at=old)
+    add_event(6, entity_id=7)
+
+    assert prune(retention=timedelta(days=3)) == 3
+    assert sorted(db.session.scalars(db.select(ChangeEvent.id))) == [4, 5, 6]
+    assert pruned_position() == 5
+
+    changes, position = ChangeConsumer(gap_grace=5).fetch()
+    assert (ids(changes), position) == ([4, 5, 6], 6)
+
+
+def test_prune_without_old_events_keeps_everything(app):
+    add_event(1)
+    add_event(2)
+    assert prune(retention=timedelta(days=3)) == 0
+    assert pruned_position() == 0
+
+
+def test_upgrade_drops_version_column(app):
+    db.session.execute(db.text('DROP TABLE change_events'))
+    db.session.execute(db.text(
+        'CREATE TABLE change_events (id INTEGER PRIMARY KEY, entity VARCHAR(50) NOT NULL, '
+        'entity_id INTEGER NOT NULL, op VARCHAR(10) NOT NULL, version INTEGER NOT NULL, created_at DATETIME NOT NULL)'))
+    db.session.execute(db.text('CREATE INDEX ix_change_events_entity ON change_events (entity, entity_id, version)'))
+    db.session.commit()
+
+    upgrade_schema()
+
+    columns = {column['name'] for column in db.inspect(db.engine).get_columns('change_events')}
+    assert 'version' not in columns
+    add_event(1)
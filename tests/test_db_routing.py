@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+
+from models import db, Category, ChangeEvent, Recipe, User
+
+
+@pytest.fixture
+def replica(app, tmp_path, monkeypatch):
+    """İkinci bir SQLite dosyası okuma kopyası olarak; içeriği birincilden farklı."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    db.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(db.insert(User.__table__).values(id=900, username='kopya', password_hash='x', created_at=now))
+        conn.execute(db.insert(Category.__table__).values(id=900, name='Çorbalar', slug='corbalar', created_at=now))
+        conn.execute(db.insert(Recipe.__table__).values(
+            id=900, title='Kopyadaki tarif', content='Metin.', excerpt='Metin.', category_id=900, user_id=900,
+            created_at=now, updated_at=now))
+    monkeypatch.setitem(db.engines, 'replica0', engine)
+    monkeypatch.setitem(app.config, 'DATABASE_REPLICA_KEYS', ['replica0'])
+    yield engine
+    engine.dispose()
+
+
+def request(app, client, method, url, **kwargs):
+    # Her istek kendi uygulama bağlamında: g (db_wrote, db_replica) istekler arasında taşınmasın
+    with app.app_context():
+        return client.open(url, method=method, **kwargs)
+
+
+def test_reads_writes_and_sticky_window(app, client, make_user, make_recipe, replica, monkeypatch):
+    make_user('cook')  # yalnızca birincilde
+    make_recipe(title='Birincildeki tarif')
+
+    html = request(app, client, 'GET', '/').get_data(as_text=True)
+    assert 'Kopyadaki tarif' in html and 'Birincildeki tarif' not in html
+
+    response = request(app, client, 'POST', '/login', data={'username': 'cook', 'password': 'secret123'})
+    assert response.status_code == 302  # kullanıcı kopyada yok: POST birincilden okudu
+
+    html = request(app, client, 'GET', '/').get_data(as_text=True)
+    assert 'Birincildeki tarif' in html  # DATABASE_STICKY_SECONDS içinde birincil
+
+    with client.session_transaction() as session:
+        session['db_primary_until'] = 0  # pencere doldu
+    html = request(app, client, 'GET', '/').get_data(as_text=True)
+    assert 'Kopyadaki tarif' in html
+
+
+def test_bulk_dml_change_events_go_to_primary(app, make_recipe, replica):
+    recipe_id = make_recipe().id
+    with app.test_request_context('/', method='GET'):
+        db.session.execute(db.update(Recipe).where(Recipe.id == recipe_id).values(title='Yeni ad'))
+        db.session.commit()
+        db.session.remove()
+
+    events = db.session.execute(
+        db.select(ChangeEvent.entity, ChangeEvent.entity_id, ChangeEvent.op).where(ChangeEvent.op == 'update')
+    ).all()
+    assert events == [('recipes', recipe_id, 'update')]
+    with replica.connect() as conn:
+        assert conn.scalar(db.select(db.func.count()).select_from(ChangeEvent.__table__)) == 0
@@ -0,0 +1,26 @@
+import re
+
+import pytest
+
+from models import db, Category
+
+
+def badges(response):
+    # Kartlardaki kategori rozeti; sayfanın kategori menüsü hariç
+    return re.findall(r'<span class="badge bg-primary[^"]*">([^<]*)</span>', response.get_data(as_text=True))
+
+
+@pytest.mark.parametrize('path', ['/', '/search?q=Mercimek'])
+def test_renamed_category_shows_on_cached_cards(app, client, make_recipe, path):
+    recipe = make_recipe()
+    app.jinja_env.fragment_cache.clear()
+    assert badges(client.get(path)) == ['Çorbalar']
+    cache = app.jinja_env.fragment_cache
+    assert cache.get(next(key for key in cache._data if key[1] == recipe.id)) is not None
+
+    # Başka bir işçi yeniden adlandırdı: bu işçinin önbelleği temizlenmedi
+    db.session.execute(db.update(Category).where(Category.id == recipe.category_id).values(name='Sıcak çorbalar'))
+    db.session.commit()
+    db.session.expire_all()
+
+    assert badges(client.get(path)) == ['Sıcak çorbalar']
@@ -0,0 +1,99 @@
+import builtins
+import errno
+import io
+import struct
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+import gallery
+from models import db, Category, Image, Recipe
+
+
+def png(width=2, height=2):
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + struct.pack('>II', width, height) + b'\x08\x02\x00\x00\x00'
+
+
+class FullDisk:
+    """İkinci dosyanın yazımı ENOSPC ile biter; dosya yarım kalır."""
+
+    def __init__(self):
+        self.opened = 0
+
+    def __call__(self, path, mode='r', *args, **kwargs):
+        handle = builtins.open(path, mode, *args, **kwargs)
+        if 'x' in mode:
+            self.opened += 1
+            if self.opened == 2:
+                write = handle.write
+
+                def fail(data):
+                    write(data[:4])
+                    raise OSError(errno.ENOSPC, 'No space left on device')
+                handle.write = fail
+        return handle
+
+
+@pytest.fixture
+def uploads(app, tmp_path, monkeypatch):
+    from app import upload_processor
+    monkeypatch.setattr(upload_processor, 'folder', str(tmp_path))
+    monkeypatch.setattr(upload_processor, 'max_workers', 1)  # sıra belirli olsun
+    monkeypatch.setattr(upload_processor, '_pid', None)
+    return tmp_path
+
+
+def recipe_form(category):
+    return {'title': 'Menemen', 'content': 'Kahvaltılık.', 'category_id': str(category.id),
+            'images': [(io.BytesIO(png()), 'a.png'), (io.BytesIO(png()), 'b.png')]}
+
+
+def login_with_category(client, make_user):
+    make_user('cook', password='secret123')
+    client.post('/login', data={'username': 'cook', 'password': 'secret123'})
+    category = Category(name='Kahvaltı', slug='kahvalti')
+    db.session.add(category)
+    db.session.commit()
+    return category
+
+
+def test_storage_error_removes_written_files(client, make_user, uploads, monkeypatch):
+    category = login_with_category(client, make_user)
+    monkeypatch.setattr(gallery, 'open', FullDisk(), raising=False)
+
+    response = client.post('/recipe/add', data=recipe_form(category), content_type='multipart/form-data')
+
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/recipe/add')
+    assert list(uploads.iterdir()) == []  # ilk dosya da yarım ikinci de silindi
+    assert Recipe.query.count() == 0 and Image.query.count() == 0
+    with client.session_transaction() as session:
+        assert any('kaydedilemedi' in message for _, message in session['_flashes'])
+
+
+def test_files_are_stored_before_the_recipe_is_written(client, make_user, uploads, monkeypatch):
+    category = login_with_category(client, make_user)
+
+    order = []
+    original = gallery.UploadProcessor._store
+
+    def store(self, file, prefix):
+        order.append('store')
+        return original(self, file, prefix)
+    monkeypatch.setattr(gallery.UploadProcessor, '_store', store)
+
+    def before_flush(session, context, instances):
+        order.append('flush')
+    event.listen(OrmSession, 'before_flush', before_flush)
+    try:
+        response = client.post('/recipe/add', data=recipe_form(category), content_type='multipart/form-data')
+    finally:
+        event.remove(OrmSession, 'before_flush', before_flush)
+
+    assert response.status_code == 302
+    assert order[:3] == ['store', 'store', 'flush']  # yazma işlemi dosyalar bittikten sonra başlar
+    recipe = Recipe.query.one()
+    assert sorted(image.position for image in recipe.images) == [0, 1]
+    assert recipe.image == min(recipe.images, key=lambda i: i.position).filename
+    assert sorted(p.name for p in uploads.iterdir()) == sorted(image.filename for image in recipe.images)
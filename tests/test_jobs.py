@@ -0,0 +1,50 @@
+import logging
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from jobs import PeriodicJobs, claim
+from models import db, JobRun
+from test_startup import load_gunicorn_conf
+
+
+def test_claim_once_per_interval(app):
+    now = datetime(2026, 10, 1, 12, 0)
+    assert claim('nightly', 3600, now=now)
+    assert not claim('nightly', 3600, now=now + timedelta(minutes=59))
+    assert claim('nightly', 3600, now=now + timedelta(minutes=60))
+    assert db.session.get(JobRun, 'nightly').last_run_at == now + timedelta(minutes=60)
+
+
+def test_only_one_worker_runs_a_due_job(app):
+    calls = []
+    workers = [PeriodicJobs(), PeriodicJobs()]
+    for jobs in workers:
+        jobs.app = app
+        jobs.add('prune', 3600, lambda: calls.append(1))
+
+    assert [jobs.run_due() for jobs in workers] == [['prune'], []]
+    assert calls == [1]
+
+
+def test_change_feed_pruning_is_scheduled(app):
+    from app import periodic_jobs, prune_change_feed
+    interval, func = periodic_jobs.jobs['prune-change-feed']
+    assert func is prune_change_feed
+    assert interval == app.config['CHANGE_FEED_PRUNE_HOURS'] * 3600
+
+
+def test_master_touches_the_app_only_with_preload(monkeypatch):
+    conf = load_gunicorn_conf()
+    calls = []
+    monkeypatch.setattr(conf, '_prune_change_feed', lambda server: calls.append('prune'))
+    monkeypatch.setattr(conf, '_warm_up', lambda log: calls.append('warm'))
+    monkeypatch.setattr(conf, '_dispose_engines', lambda close: calls.append(('dispose', close)))
+
+    def server(preload):
+        cfg = SimpleNamespace(preload_app=preload, workers=1, threads=1, worker_class_str='sync')
+        return SimpleNamespace(cfg=cfg, log=logging.getLogger('test.gunicorn'))
+
+    conf.when_ready(server(False))
+    assert calls == []  # preload kapalı: ana süreç uygulamayı import etmez, bağlantı açmaz
+    conf.when_ready(server(True))
+    assert calls == ['prune', 'warm', ('dispose', True)]
@@ -0,0 +1,30 @@
+import app as app_module
+from models import db, Recipe
+
+
+def test_sitemap_index_tolerates_missing_updated_at(client, make_recipe, monkeypatch):
+    recipe = make_recipe()
+    db.session.execute(db.update(Recipe).where(Recipe.id == recipe.id).values(updated_at=None),
+                       execution_options={'change_feed': False})
+    db.session.commit()
+    monkeypatch.setattr(app_module, 'SITEMAP_MAX_URLS', 0)
+
+    response = client.get('/sitemap.xml')
+    assert response.status_code == 200
+    assert b'<sitemapindex' in response.data
+    assert b'sitemap-recipes-0.xml</loc></sitemap>' in response.data
+
+    segment = client.get('/sitemap-recipes-0.xml')
+    assert f'/recipe/{recipe.id}</loc></url>'.encode() in segment.data
+
+
+def test_segment_cache_is_bounded(client, make_recipe, monkeypatch):
+    monkeypatch.setattr(app_module, 'SITEMAP_SEGMENT_SIZE', 1)
+    cache = app_module.sitemap_segment_cache
+    cache.clear()
+    recipes = [make_recipe(f'Tarif {n}') for n in range(5)]
+
+    for recipe in recipes:
+        response = client.get(f'/sitemap-recipes-{recipe.id}.xml')
+        assert f'/recipe/{recipe.id}</loc>'.encode() in response.data
+    assert len(cache._data) == cache.maxsize
@@ -0,0 +1,52 @@
+import importlib.util
+import logging
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+from conftest import ROOT
+
+
+def load_gunicorn_conf():
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', os.path.join(ROOT, 'gunicorn.conf.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_import_does_not_warm_up():
+    # flask komutları ve testler uygulamayı import eder; ısınma yalnızca gunicorn'da
+    env = dict(os.environ, WARM_UP_ON_START='1', LOG_LEVEL='INFO')
+    probe = 'import app, sys; sys.exit(0 if app.app.config["WARM_UP_ON_START"] else 1)'
+    result = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert 'Warm-up' not in result.stdout + result.stderr
+
+
+def test_import_time_budget(app):
+    # -X importtime ile temiz bir süreçte import + ilk istek; tablolar fixture'dan
+    import startup_check
+    report = startup_check.run_probe({'DB_INIT_ON_STARTUP': '0'})
+    assert startup_check.problems(report) == []
+    assert report['imports'], 'no -X importtime output parsed'
+
+
+def test_budget_check_flags_eager_imports():
+    import startup_check
+    report = {'import_ms': 2000.0, 'modules': ['app', 'requests']}
+    assert len(startup_check.problems(report, budget_ms=1500)) == 2
+
+
+def test_worker_warms_up_without_preload(app, monkeypatch):
+    import app as app_module
+    calls = []
+    monkeypatch.setattr(app_module, 'warm_up', lambda: calls.append(1) or 0.0)
+    monkeypatch.setitem(app.config, 'WARM_UP_ON_START', True)
+    conf = load_gunicorn_conf()
+    log = logging.getLogger('test.gunicorn')
+
+    conf.post_worker_init(SimpleNamespace(cfg=SimpleNamespace(preload_app=True), log=log))
+    assert calls == []  # preload: ana süreç when_ready'de ısındı
+    conf.post_worker_init(SimpleNamespace(cfg=SimpleNamespace(preload_app=False), log=log))
+    assert calls == [1]
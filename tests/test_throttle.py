@@ -0,0 +1,102 @@
+import pytest
+
+from models import db, User
+
+
+def login(client, username, password, ip):
+    return client.post('/login', data={'username': username, 'password': password},
+                       headers={'X-Forwarded-For': ip}, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+
+
+def test_forwarded_ips_have_separate_buckets(client, make_user):
+    make_user('admin', password='admin123', is_admin=True)
+    for n in range(11):
+        login(client, f'nobody{n}', 'wrong', '203.0.113.7')
+    assert login(client, 'someone', 'wrong', '203.0.113.7').status_code == 429
+
+    response = login(client, 'admin', 'admin123', '198.51.100.23')
+    assert response.status_code == 302
+
+
+def test_registration_limit_is_per_forwarded_ip(client):
+    for n in range(5):
+        client.post('/register', data={'username': f'u{n}', 'password': 'secret123', 'password_confirm': 'secret123'},
+                    headers={'X-Forwarded-For': '203.0.113.7'})
+    blocked = client.post('/register', data={'username': 'u5', 'password': 'secret123', 'password_confirm': 'secret123'},
+                          headers={'X-Forwarded-For': '203.0.113.7'})
+    assert blocked.status_code == 429
+
+    allowed = client.post('/register', data={'username': 'u6', 'password': 'secret123', 'password_confirm': 'secret123'},
+                          headers={'X-Forwarded-For': '198.51.100.23'})
+    assert allowed.status_code == 302
+    assert User.query.filter_by(username='u6').one()
+
+
+@pytest.mark.parametrize('addr, proxy_fix, expected', [
+    ('10.0.0.1', 0, None),            # yapılandırılmamış proxy: herkes aynı adres
+    ('127.0.0.1', 0, None),
+    ('203.0.113.7', 0, None),         # belgeleme bloğu da global değil
+    ('8.8.8.8', 0, '8.8.8.8'),
+    ('10.0.0.1', 1, '10.0.0.1'),      # ProxyFix çözdüyse güvenilir
+])
+def test_client_ip_ignores_untrusted_proxy_addresses(app, monkeypatch, addr, proxy_fix, expected):
+    from app import client_ip
+    monkeypatch.setitem(app.config, 'PROXY_FIX_X_FOR', proxy_fix)
+    with app.test_request_context(environ_base={'REMOTE_ADDR': addr}):
+        assert client_ip() == expected
+
+
+def test_database_store_survives_concurrent_first_attempt(app, monkeypatch):
+    from app import DatabaseThrottleStore, TokenBucketThrottle
+    from models import LoginThrottle
+    store = DatabaseThrottleStore(maxsize=100)
+    throttle = TokenBucketThrottle(store, 'login-ip:', capacity=10, per_seconds=60)
+    assert throttle.hit('203.0.113.7') == 0
+
+    # Başka bir işçi satırı bizim okumamızdan hemen sonra ekledi
+    read = store._read
+    misses = [None]
+    monkeypatch.setattr(store, '_read', lambda conn, key: misses.pop() if misses else read(conn, key))
+
+    assert throttle.hit('203.0.113.7') == 0
+    assert misses == []
+    assert db.session.get(LoginThrottle, 'login-ip:203.0.113.7').tokens == pytest.approx(8, abs=0.1)
+
+
+def test_database_store_evicts_stalest_keys(app):
+    from app import DatabaseThrottleStore, TokenBucketThrottle
+    from models import LoginThrottle
+    store = DatabaseThrottleStore(maxsize=5, evict_interval=0)
+    throttle = TokenBucketThrottle(store, 'login-ip:', capacity=10, per_seconds=60)
+    for n in range(8):
+        throttle.hit(f'198.51.100.{n}')
+
+    keys = {row.key for row in LoginThrottle.query}
+    assert len(keys) <= 5
+    assert 'login-ip:198.51.100.7' in keys
+
+
+def test_database_store_concurrent_hits_are_all_counted(app):
+    import threading
+    from app import DatabaseThrottleStore, TokenBucketThrottle
+    from models import LoginThrottle
+    throttle = TokenBucketThrottle(DatabaseThrottleStore(maxsize=100), 'login-ip:', capacity=100, per_seconds=3600)
+    errors = []
+    barrier = threading.Barrier(20)
+
+    def attempt(n):
+        with app.app_context():
+            barrier.wait()
+            try:
+                throttle.hit(f'203.0.113.{n % 3}')
+            except Exception as exc:
+                errors.append(exc)
+    threads = [threading.Thread(target=attempt, args=(n,)) for n in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    # 7 + 7 + 6 deneme; hiçbiri kaybolmadı (yenilenme saatte 100 jeton, ihmal edilir)
+    assert sorted(round(row.tokens) for row in LoginThrottle.query) == [93, 93, 94]
@@ -0,0 +1,39 @@
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from models import db, RecipeView
+
+
+@pytest.fixture
+def far_timezone():
+    # Yerel tarihin şu an UTC tarihinden farklı olduğu bir saat dilimi
+    zone = 'Etc/GMT-14' if datetime.utcnow().hour >= 12 else 'Etc/GMT+12'
+    previous = os.environ.get('TZ')
+    os.environ['TZ'] = zone
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ['TZ']
+    else:
+        os.environ['TZ'] = previous
+    time.tzset()
+
+
+def test_views_are_bucketed_by_utc_day(app, make_recipe, far_timezone):
+    from app import view_counter
+    recipe = make_recipe()
+    view_counter._pending[recipe.id] += 3
+
+    assert view_counter.flush() == 3
+    view = db.session.execute(db.select(RecipeView.day, RecipeView.views)).one()
+    assert view == (datetime.utcnow().date(), 3)
+
+
+def test_trending_refresh_is_a_claimed_job(app):
+    from app import periodic_jobs, view_counter
+    interval, func = periodic_jobs.jobs['refresh-trending']
+    assert func == view_counter.refresh_trending
+    assert interval == float(os.getenv('TRENDING_REFRESH_SECONDS', 300))
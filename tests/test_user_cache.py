@@ -0,0 +1,43 @@
+from models import db, User
+
+
+def login(client, username):
+    client.post('/login', data={'username': username, 'password': 'secret123'})
+
+
+def get(app, client, url):
+    # Fixture'ın açık uygulama bağlamı paylaşılırsa g._login_user istekler arasında
+    # kalır ve user_loader hiç çağrılmaz; her istek gerçek işçideki gibi kendi bağlamında
+    with app.app_context():
+        return client.get(url)
+
+
+def test_admins_are_never_served_from_cache(app, client, make_user, make_recipe):
+    admin = make_user('moderator', is_admin=True)
+    recipe = make_recipe()
+    login(client, 'moderator')
+    assert get(app, client, f'/recipe/{recipe.id}/edit').status_code == 200
+
+    # Başka bir işçi yetkiyi aldı: bu işçinin önbelleğine dokunulmadı
+    db.session.execute(db.update(User).where(User.id == admin.id).values(is_admin=False))
+    db.session.commit()
+
+    assert get(app, client, f'/recipe/{recipe.id}/edit').status_code == 302
+
+
+def test_user_deleted_in_another_worker_is_evicted(app, client, make_user, monkeypatch):
+    from app import user_cache
+    monkeypatch.setattr(user_cache, 'check_interval', 0)
+    user = make_user('cook')
+    user_id = user.id
+    login(client, 'cook')
+    assert get(app, client, '/recipe/add').status_code == 200
+    assert user_cache.get(user_id) is not None
+
+    db.session.execute(db.delete(User).where(User.id == user_id))
+    db.session.commit()
+
+    response = get(app, client, '/recipe/add')
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
+    assert user_cache.get(user_id) is None
@@ -0,0 +1,171 @@
+"""Tarif görüntülenme sayaçları ve zamanla sönümlenen popülerlik puanı.
+
+Her görüntülenme yalnızca bellekteki bir sözlüğü artırır; arka plandaki bir
+iş parçacığı birkaç saniyede bir biriken sayıları ``recipe_views`` tablosuna
+(tarif, UTC gün) başına tek bir toplu upsert ile yazar. ``trending_score`` ve
+``weekly_views`` kolonları ``refresh_trending`` ile yeniden hesaplanır; bu tüm
+tabloyu yazdığından işçi başına değil, periyodik bir iş olarak tüm işçiler
+arasında bir kez çalışır (bkz. jobs.py). Liste sorguları bu indeksli
+kolonları okur.
+
+Puan, son ``window_days`` gündeki görüntülenmelerin ve yorum puanlarının
+yarı ömrü ``half_life_hours`` olan üstel sönümle ağırlıklandırılmış toplamıdır.
+"""
+import atexit
+import math
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from importlib import import_module
+
+from models import db, Recipe, Comment, RecipeView
+
+# Diyalekt modülleri ilk yazmada yüklenir (açılış süresi)
+_UPSERT_DIALECTS = ('postgresql', 'sqlite')
+
+
+class ViewCounter:
+    """Per-process view buffer with a lazily started flush thread."""
+
+    def __init__(self, app=None, flush_interval=5.0, half_life_hours=48.0, window_days=14, comment_weight=2.0):
+        self.flush_interval = flush_interval
+        self.half_life_hours = half_life_hours
+        self.window_days = window_days
+        self.comment_weight = comment_weight  # bir yorum yıldızı kaç görüntülenme sayılır
+        self.app = None
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._thread_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        atexit.register(self._flush_at_exit)
+
+    # ----- sayma -----
+
+    def hit(self, recipe_id):
+        with self._lock:
+            self._pending[recipe_id] += 1
+            # Fork sonrası (gunicorn preload) her işçi kendi iş parçacığını başlatır
+            if self._thread_pid != os.getpid():
+                self._thread_pid = os.getpid()
+                threading.Thread(target=self._run, name='view-counter', daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception:
+                self.app.logger.exception('View counter flush failed')
+
+    def _flush_at_exit(self):
+        if self._pending and self.app is not None:
+            with self.app.app_context():
+                self.flush()
+
+    # ----- yazma -----
+
+    def flush(self, today=None):
+        """Write buffered views with one upsert; returns the number of views written."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+        # Gün kovaları UTC: refresh_trending yaşı ve haftayı utcnow'a göre hesaplar
+        today = today or datetime.utcnow().date()
+        with db.engine.begin() as conn:
+            # Bu arada silinmiş tariflerin sayaçları FK hatasına yol açmasın
+            existing = set(conn.scalars(db.select(Recipe.id).where(Recipe.id.in_(pending))))
+            rows = [{'recipe_id': recipe_id, 'day': today, 'views': views}
+                    for recipe_id, views in pending.items() if recipe_id in existing]
+            if rows:
+                self._upsert(conn, rows)
+        return sum(row['views'] for row in rows)
+
+    @staticmethod
+    def _upsert(conn, rows):
+        table = RecipeView.__table__
+        if conn.dialect.name in _UPSERT_DIALECTS:
+            stmt = import_module(f'sqlalchemy.dialects.{conn.dialect.name}').insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.recipe_id, table.c.day],
+                set_={'views': table.c.views + stmt.excluded.views},
+            )
+            conn.execute(stmt, rows)
+            return
+        # Upsert desteklemeyen veritabanları: önce güncelle, olmayanları ekle
+        for row in rows:
+            updated = conn.execute(
+                db.update(table).where(table.c.recipe_id == row['recipe_id'], table.c.day == row['day'])
+                .values(views=table.c.views + row['views'])
+            ).rowcount
+            if not updated:
+                conn.execute(db.insert(table), row)
+
+    # ----- puanlama -----
+
+    def _decay(self, age_hours):
+        return math.pow(0.5, max(age_hours, 0.0) / self.half_life_hours)
+
+    def refresh_trending(self, now=None):
+        """Recompute ``trending_score`` and ``weekly_views`` for every recipe."""
+        now = now or datetime.utcnow()
+        since = now.date() - timedelta(days=self.window_days - 1)
+        week_start = now.date() - timedelta(days=6)
+        scores, weekly = Counter(), Counter()
+
+        views = db.session.execute(
+            db.select(RecipeView.recipe_id, RecipeView.day, RecipeView.views).where(RecipeView.day >= since)
+        )
+        for recipe_id, day, count in views:
+            # Gün kovası gün ortasında toplanmış sayılır
+            age = (now - datetime.combine(day, datetime.min.time())).total_seconds() / 3600 - 12
+            scores[recipe_id] += count * self._decay(age)
+            if day >= week_start:
+                weekly[recipe_id] += count
+
+        comments = db.session.execute(
+            db.select(Comment.recipe_id, Comment.rating, Comment.created_at)
+            .where(Comment.created_at >= datetime.combine(since, datetime.min.time()))
+        )
+        for recipe_id, rating, created_at in comments:
+            age = (now - created_at).total_seconds() / 3600
+            scores[recipe_id] += self.comment_weight * (rating or 3) * self._decay(age)
+
+        db.session.execute(
+            db.update(Recipe).where(db.or_(Recipe.trending_score != 0, Recipe.weekly_views != 0))
+            .values(trending_score=0, weekly_views=0, updated_at=Recipe.updated_at),
+            execution_options={'synchronize_session': False, 'change_feed': False},
+        )
+        rows = [{'recipe_id': recipe_id, 'score': round(scores[recipe_id], 4), 'week': weekly[recipe_id]}
+                for recipe_id in scores.keys() | weekly.keys()]
+        if rows:
+            db.session.execute(
+                db.update(Recipe.__table__).where(Recipe.__table__.c.id == db.bindparam('recipe_id'))
+                .values(trending_score=db.bindparam('score'), weekly_views=db.bindparam('week'),
+                        updated_at=Recipe.__table__.c.updated_at),
+                rows,
+            )
+        db.session.commit()
+        return len(rows)
+
+
+def trending_recipes(limit=6, category_id=None):
+    query = Recipe.query.options(Recipe.card_columns()).filter(Recipe.trending_score > 0)
+    if category_id is not None:
+        query = query.filter(Recipe.category_id == category_id)
+    return query.order_by(Recipe.trending_score.desc()).limit(limit).all()
+
+
+def popular_this_week(limit=6, category_id=None):
+    query = Recipe.query.options(Recipe.card_columns()).filter(Recipe.weekly_views > 0)
+    if category_id is not None:
+        query = query.filter(Recipe.category_id == category_id)
+    return query.order_by(Recipe.weekly_views.desc()).limit(limit).all()